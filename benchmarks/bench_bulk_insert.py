@@ -0,0 +1,81 @@
+# 批量写入策略基准：对比通用 executemany 与各目标适配器的专用 bulk_insert
+# 用法: python benchmarks/bench_bulk_insert.py --rows 100000 [--config config-v1.0.yaml]
+import argparse
+import importlib.util
+import os
+import random
+import string
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_TABLE = 'bench_bulk_insert'
+
+
+def load_sync_module():
+    # 主程序文件名带连字符，只能按路径加载
+    spec = importlib.util.spec_from_file_location('sync_table', os.path.join(ROOT_DIR, 'sync_table-2.0.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_rows(count):
+    rng = random.Random(42)
+    return [
+        (i, ''.join(rng.choices(string.ascii_letters, k=rng.randint(10, 100))), rng.random() * 1e6)
+        for i in range(count)
+    ]
+
+
+def run_strategy(adapter, insert, rows, batch_size, column_types):
+    columns = ['id', 'name', 'amount']
+    adapter.cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    adapter.cursor.execute(
+        f"CREATE TABLE {BENCH_TABLE} ({', '.join(f'{c} {t}' for c, t in zip(columns, column_types))})"
+    )
+    start = time.perf_counter()
+    for i in range(0, len(rows), batch_size):
+        insert(BENCH_TABLE, columns, rows[i:i+batch_size], column_types)
+    if not getattr(adapter.conn, 'autocommit', False):
+        adapter.conn.commit()
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量写入策略基准测试')
+    parser.add_argument('--config', default=os.path.join(ROOT_DIR, 'config-v1.0.yaml'))
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    sync = load_sync_module()
+    config = sync.load_config(args.config)
+    adapter = sync.get_adapter(config['target']['type'])
+    adapter.connect(config['target']['config'])
+    column_types = [adapter.map_type('int', None), adapter.map_type('nvarchar', 100), adapter.map_type('float', None)]
+    rows = make_rows(args.rows)
+
+    strategies = [('executemany', lambda *a: sync.DatabaseAdapter.bulk_insert(adapter, *a))]
+    if isinstance(adapter, sync.PostgreSQLAdapter):
+        for copy_format in ('text', 'binary'):
+            def copy_insert(*a, copy_format=copy_format):
+                adapter.copy_format = copy_format
+                adapter.bulk_insert(*a)
+            strategies.append((f'copy ({copy_format})', copy_insert))
+    else:
+        strategies.append((adapter.bulk_strategy, adapter.bulk_insert))
+
+    try:
+        print(f"目标: {config['target']['type']}  行数: {args.rows}  批大小: {args.batch_size}")
+        for name, insert in strategies:
+            rate = run_strategy(adapter, insert, rows, args.batch_size, column_types)
+            print(f"{name:<20} {rate:>12,.0f} rows/s")
+    finally:
+        adapter.cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        if not getattr(adapter.conn, 'autocommit', False):
+            adapter.conn.commit()
+        adapter.disconnect()
+
+
+if __name__ == '__main__':
+    main()
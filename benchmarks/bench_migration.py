@@ -0,0 +1,313 @@
+# 迁移引擎基准：在本地 SQLite 生成合成源表，用 migrate_table 按不同批大小/写入策略/读写模式迁移，
+# 记录 rows/s、峰值 RSS 与 CPU 时间，并与保存的基线对比以发现性能回退
+# 用法:
+#   python benchmarks/bench_migration.py --rows 1000000                      # SQLite -> SQLite
+#   python benchmarks/bench_migration.py --target-config config-v1.0.yaml    # SQLite -> 配置文件中的本地目标库
+#   python benchmarks/bench_migration.py --save-baseline                     # 将本次结果保存为基线
+import argparse
+import importlib.util
+import json
+import os
+import random
+import resource
+import sqlite3
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# 源表列定义使用 SQL Server 风格的类型名，目标适配器的 map_type 可直接映射
+WORKLOADS = {
+    'narrow': ['id int PRIMARY KEY', 'k int', 'amount float'],
+    'wide': ['id int PRIMARY KEY'] + [
+        f'c{i} {("int", "float", "nvarchar(32)")[i % 3]}' for i in range(40)
+    ],
+    'text': ['id int PRIMARY KEY', 'title nvarchar(200)', 'body nvarchar(4000)', 'note nvarchar(1000)'],
+    'blob': ['id int PRIMARY KEY', 'name nvarchar(50)', 'payload varbinary(8000)'],
+}
+# arrow 为 Arrow 列式批次传输，parquet 在此基础上先落盘为 Parquet 再写入；未安装 pyarrow 时不参与默认对比
+MODES = ('serial', 'pipeline') + (('arrow', 'parquet') if importlib.util.find_spec('pyarrow') else ())
+
+
+def load_sync_module():
+    # 主程序文件名带连字符，只能按路径加载
+    spec = importlib.util.spec_from_file_location('sync_table', os.path.join(ROOT_DIR, 'sync_table-2.0.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_row_factory(workload):
+    # 固定随机种子，预生成字符串池以免数据生成成为瓶颈
+    rng = random.Random(42)
+    words = [''.join(rng.choices(string.ascii_letters, k=rng.randint(3, 12))) for _ in range(2000)]
+
+    def text(low, high):
+        return ' '.join(rng.choices(words, k=rng.randint(low, high)))
+
+    if workload == 'narrow':
+        return lambda i: (i, rng.randint(0, 1 << 30), rng.random() * 1e6)
+    if workload == 'wide':
+        return lambda i: (i,) + tuple(
+            (rng.randint(0, 1 << 30), rng.random(), rng.choice(words))[c % 3] for c in range(40)
+        )
+    if workload == 'text':
+        return lambda i: (i, text(3, 20), text(50, 400), text(10, 100))
+    blobs = [rng.randbytes(rng.randint(256, 4096)) for _ in range(256)]
+    return lambda i: (i, rng.choice(words), rng.choice(blobs))
+
+
+def generate_source(path, workload, rows):
+    # 已存在同规模的源库时直接复用
+    meta_path = path + '.meta'
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            if json.load(f) == {'workload': workload, 'rows': rows}:
+                return
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute('PRAGMA journal_mode=OFF')
+    columns = WORKLOADS[workload]
+    conn.execute(f"CREATE TABLE bench_{workload} ({', '.join(columns)})")
+    make_row = make_row_factory(workload)
+    sql = f"INSERT INTO bench_{workload} VALUES ({', '.join('?' * len(columns))})"
+    chunk = 50000
+    print(f"生成源表 bench_{workload}: {rows} 行...")
+    for start in range(0, rows, chunk):
+        conn.executemany(sql, (make_row(i) for i in range(start, min(start + chunk, rows))))
+        conn.commit()
+    conn.close()
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'workload': workload, 'rows': rows}, f)
+
+
+class _SQLiteCursor:
+    # migrate_table 的建表语句为 "DROP ...; CREATE ..."，多语句交给 executescript
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        if not params and ';' in sql.strip().rstrip(';'):
+            self._cursor.connection.executescript(sql)
+        else:
+            self._cursor.execute(sql, params)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def make_sqlite_adapter(sync):
+    class SQLiteAdapter(sync.DatabaseAdapter):
+        bulk_strategy = 'executemany'
+
+        def connect(self, config):
+            self.conn = sqlite3.connect(config['path'], check_same_thread=False)
+            self.conn.execute('PRAGMA synchronous=OFF')
+            self.conn.execute('PRAGMA journal_mode=MEMORY')
+            self.cursor = _SQLiteCursor(self.conn.cursor())
+
+        def get_columns_query(self, table_name):
+            # 类型名与长度分开返回，与其他适配器的列查询格式一致
+            return f"""
+                SELECT name,
+                       CASE WHEN instr(type, '(') > 0 THEN substr(type, 1, instr(type, '(') - 1) ELSE type END,
+                       CASE WHEN instr(type, '(') > 0 THEN CAST(substr(type, instr(type, '(') + 1) AS INTEGER) END
+                FROM pragma_table_info('{table_name}')
+            """
+
+        def get_split_column_query(self, table_name):
+            return f"SELECT name, type FROM pragma_table_info('{table_name}') WHERE pk = 1"
+
+        def map_type(self, sql_type, max_length):
+            return f"{sql_type}({max_length})" if max_length else sql_type
+
+        def get_placeholders(self, count):
+            return ', '.join(['?'] * count)
+
+        def create_stream_cursor(self, batch_size):
+            cursor = self.conn.cursor()
+            cursor.arraysize = batch_size
+            return cursor
+
+    return SQLiteAdapter
+
+
+def peak_rss_mb():
+    # Linux 上 ru_maxrss 单位为 KB，macOS 为字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(case, work_dir, target_config_path, result_path):
+    # 子进程中执行单个用例，保证峰值 RSS 和 CPU 时间互不影响
+    sync = load_sync_module()
+    SQLiteAdapter = make_sqlite_adapter(sync)
+    source = SQLiteAdapter()
+    source.connect({'path': os.path.join(work_dir, f"source_{case['workload']}_{case['rows']}.db")})
+    if target_config_path:
+        config = sync.load_config(target_config_path)
+        target = sync.get_adapter(config['target']['type'])
+        sync.configure_target(target, config)
+        if case['strategy'].startswith('copy'):
+            target.copy_format = case['strategy'].split(':')[1]
+        target.connect(config['target']['config'])
+        target.begin_fast_load_session()
+        if case['strategy'] == 'executemany':
+            target.bulk_insert = types.MethodType(sync.DatabaseAdapter.bulk_insert, target)
+    else:
+        config = {}
+        target_path = os.path.join(work_dir, 'target.db')
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        target = SQLiteAdapter()
+        target.connect({'path': target_path})
+    # 批大小为 auto 时启用按字节的自适应批大小
+    adaptive = case['batch_size'] == 'auto'
+    batch_size = sync.DEFAULT_BATCH_SIZE if adaptive else case['batch_size']
+    config.update({
+        'batch_size': batch_size, 'adaptive_batch': adaptive, 'pipeline': case['mode'] == 'pipeline', 'pipeline_writers': 1,
+        'partitions': 1, 'create_indexes': False, 'checkpoint': False,
+        'transport': 'arrow' if case['mode'] in ('arrow', 'parquet') else 'rows',
+        'arrow_spill_dir': work_dir if case['mode'] == 'parquet' else '',
+    })
+
+    table_name = f"bench_{case['workload']}"
+    sync.is_running = True
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    try:
+        result = sync.migrate_table(source, target, table_name, sync.MigrationProgress(1), case['rows'],
+                                    batch_size, config)
+    finally:
+        elapsed = time.perf_counter() - start
+        target.cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+        target.commit()
+        source.disconnect()
+        target.disconnect()
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_seconds = ((usage_after.ru_utime - usage_before.ru_utime) +
+                   (usage_after.ru_stime - usage_before.ru_stime))
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'rows': result['rows'],
+            'seconds': round(elapsed, 3),
+            'rows_per_s': round(result['rows'] / elapsed, 1),
+            'cpu_seconds': round(cpu_seconds, 3),
+            'cpu_percent': round(100 * cpu_seconds / elapsed, 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }, f)
+
+
+def case_key(case):
+    return f"{case['workload']}/{case['rows']}/{case['strategy']}/{case['mode']}/batch={case['batch_size']}"
+
+
+def target_strategies(target_config_path):
+    # 本地目标库时对比通用 executemany 与适配器专用策略（PostgreSQL 分别测试 COPY text/binary）
+    if not target_config_path:
+        return ['executemany']
+    sync = load_sync_module()
+    config = sync.load_config(target_config_path)
+    adapter = sync.get_adapter(config['target']['type'])
+    if isinstance(adapter, sync.PostgreSQLAdapter):
+        return ['executemany', 'copy:text', 'copy:binary']
+    return ['executemany', adapter.bulk_strategy]
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    # 吞吐低于基线或峰值内存高于基线超过容差即视为回退
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result['rows_per_s'] < base['rows_per_s'] * (1 - tolerance):
+            regressions.append(f"{key}: rows/s {result['rows_per_s']:,.0f} < 基线 {base['rows_per_s']:,.0f}")
+        if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{key}: 峰值 RSS {result['peak_rss_mb']} MB > 基线 {base['peak_rss_mb']} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='迁移引擎基准测试')
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help='逗号分隔: narrow,wide,text,blob')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch-sizes', default='1000,10000,auto', help='逗号分隔，auto 表示自适应批大小')
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--target-config', help='使用配置文件中的目标库（本地 PostgreSQL/MySQL 等），默认目标为 SQLite')
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'sync_table_bench'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    target_config = os.path.abspath(args.target_config) if args.target_config else None
+
+    if args.run_case:
+        os.chdir(args.work_dir)
+        run_case(json.loads(args.run_case), args.work_dir, target_config, args.result)
+        return
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    workloads = args.workloads.split(',')
+    for workload in workloads:
+        generate_source(os.path.join(args.work_dir, f"source_{workload}_{args.rows}.db"), workload, args.rows)
+
+    results = {}
+    result_path = os.path.join(args.work_dir, 'result.json')
+    for workload in workloads:
+        for strategy in target_strategies(target_config):
+            for mode in args.modes.split(','):
+                for batch_size in (b if b == 'auto' else int(b) for b in args.batch_sizes.split(',')):
+                    if batch_size == 'auto' and mode in ('arrow', 'parquet'):
+                        # 自适应批大小只作用于逐行传输，列式传输下与固定批大小的结果相同
+                        continue
+                    case = {'workload': workload, 'rows': args.rows, 'strategy': strategy,
+                            'mode': mode, 'batch_size': batch_size}
+                    command = [sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case),
+                               '--work-dir', args.work_dir, '--result', result_path]
+                    if target_config:
+                        command += ['--target-config', target_config]
+                    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+                    with open(result_path, encoding='utf-8') as f:
+                        result = json.load(f)
+                    results[case_key(case)] = result
+                    print(f"{case_key(case):<48} {result['rows_per_s']:>12,.0f} rows/s  "
+                          f"CPU {result['cpu_percent']:>5.1f}%  峰值 RSS {result['peak_rss_mb']:>8.1f} MB")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+        print(f"基线已保存: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线 {args.baseline}，可使用 --save-baseline 保存本次结果")
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+    if regressions:
+        print("性能回退:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("未发现性能回退")
+
+
+if __name__ == '__main__':
+    main()
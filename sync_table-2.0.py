@@ -1,17 +1,90 @@
 import pyodbc
 import psycopg2
+import psycopg2.extras
 import mysql.connector
 import cx_Oracle  # 若需Oracle支持需安装
 import logging
-import tkinter as tk
-from tkinter import messagebox, ttk
+try:
+    import tkinter as tk
+    from tkinter import messagebox, ttk
+except ImportError:  # 无图形环境的服务器只使用命令行模式
+    tk = None
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # 列式传输（transport: arrow）需要 pyarrow，逐行传输不依赖
+    pa = None
+try:
+    import arrow_odbc  # SQL Server 源端按列读取（可选）
+except ImportError:
+    arrow_odbc = None
+try:
+    import zstandard  # 导出文件 zstd 压缩（可选）
+except ImportError:
+    zstandard = None
 import threading
 import yaml
 import time
+import uuid
+import io
+import struct
+import datetime
+import queue
+import decimal
+import random
+import json
+import os
+import sys
+import signal
+import argparse
+import asyncio
+import contextlib
+import gzip
+import mmap
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # 全局状态标志
 is_running = False
 
+# 默认每批读取/写入的行数（可在配置文件中通过 batch_size 覆盖）
+DEFAULT_BATCH_SIZE = 1000
+
+# 自适应批大小（adaptive_batch）：目标单批写入耗时（秒）、每个读写流的内存上限（字节），
+# 可在配置文件中通过 batch_target_seconds/batch_max_bytes 覆盖；每批行数限定在 BATCH_MIN_ROWS~BATCH_MAX_ROWS
+DEFAULT_BATCH_TARGET_SECONDS = 1.0
+DEFAULT_BATCH_MAX_BYTES = 64 * 1024 * 1024
+BATCH_MIN_ROWS = 100
+BATCH_MAX_ROWS = 100000
+# 实测行宽时每批等间隔抽样的行数
+BATCH_SAMPLE_ROWS = 64
+
+# 按列定义估算行宽：定长类型按 8 字节，声明长度的类型按声明长度，大对象类型（及长度为 -1/MAX 的列）按 ROW_WIDTH_LOB_BYTES
+ROW_WIDTH_LOB_BYTES = 8192
+ROW_WIDTH_LOB_TYPES = {'text', 'ntext', 'image', 'xml', 'clob', 'nclob', 'blob', 'bytea', 'long', 'long raw',
+                       'mediumtext', 'longtext', 'mediumblob', 'longblob', 'json', 'jsonb', 'geometry', 'geography'}
+
+# 行数不少于该值的表才按主键范围拆分并行复制（可在配置文件中通过 partition_min_rows 覆盖）
+DEFAULT_PARTITION_MIN_ROWS = 1000000
+DEFAULT_COMMIT_ROWS = 10000
+
+# 瞬时错误（死锁、超时、断线）的默认重试次数和退避时间（秒），可通过 retry_attempts/retry_backoff/retry_backoff_max 覆盖
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 1.0
+DEFAULT_RETRY_BACKOFF_MAX = 30.0
+
+# 可用于范围拆分的列类型
+SPLIT_NUMBER_TYPES = {'int', 'integer', 'bigint', 'smallint', 'tinyint', 'numeric', 'decimal', 'number'}
+SPLIT_DATE_TYPES = {'date', 'datetime', 'datetime2', 'smalldatetime', 'timestamp'}
+
+# 数据校验时两端能规范化为相同文本的列类型；浮点、定点小数、二进制、大对象、UUID 等在各库的文本表示不同，只参与行数比对
+CHECKSUM_NUMBER_TYPES = {'int', 'integer', 'bigint', 'smallint', 'tinyint', 'mediumint'}
+CHECKSUM_BOOL_TYPES = {'bit', 'boolean', 'bool'}
+CHECKSUM_TEXT_TYPES = {'char', 'varchar', 'nchar', 'nvarchar', 'text', 'ntext', 'character', 'character varying',
+                       'varchar2', 'nvarchar2', 'tinytext', 'mediumtext', 'longtext'}
+
 # 日志配置
 logging.basicConfig(
     level=logging.INFO,
@@ -20,36 +93,240 @@ logging.basicConfig(
     filemode='a'
 )
 
-def log_info(message, text_widget=None, color="green"):
+# 引擎事件订阅者：callback(event, data)，event 为 'log'（data: message, color）或 'progress'（data: percent）；
+# 回调在迁移线程中调用，界面类订阅者需自行切回界面线程
+listeners = []
+
+def add_listener(callback):
+    listeners.append(callback)
+
+def remove_listener(callback):
+    if callback in listeners:
+        listeners.remove(callback)
+
+def notify(event, **data):
+    for callback in list(listeners):
+        try:
+            callback(event, data)
+        except Exception as e:
+            logging.error(f"事件订阅者处理失败: {str(e)}")
+
+def log_info(message, color="green"):
     logging.info(message)
     print(message)
-    if text_widget:
-        append_to_log(text_widget, message, color)
+    notify('log', message=message, color=color)
 
-def log_error(message, text_widget=None):
+def log_error(message):
     logging.error(message)
     print(f"❌ {message}")
-    if text_widget:
-        append_to_log(text_widget, message, "red")
+    notify('log', message=message, color="red")
+
+def split_column_type(col_type):
+    # 'VARCHAR(50)' -> ('VARCHAR', 50)，无长度时返回 0
+    base, _, rest = col_type.partition('(')
+    length = rest.split(',')[0].rstrip(')').strip()
+    return base.strip().upper(), int(length) if length.isdigit() else 0
+
+def classify_split_type(data_type):
+    # 返回 'number' / 'date'，不可拆分的类型返回 None
+    base = data_type.split('(')[0].strip().lower()
+    if base in SPLIT_NUMBER_TYPES:
+        return 'number'
+    if base in SPLIT_DATE_TYPES or base.startswith('timestamp'):
+        return 'date'
+    return None
+
+def classify_checksum_type(data_type):
+    # 返回 'number' / 'bool' / 'text' / 'date'，不参与校验和的类型返回 None
+    base = str(data_type).split('(')[0].strip().lower()
+    if base in CHECKSUM_NUMBER_TYPES:
+        return 'number'
+    if base in CHECKSUM_BOOL_TYPES:
+        return 'bool'
+    if base in CHECKSUM_TEXT_TYPES:
+        return 'text'
+    if base in SPLIT_DATE_TYPES or base.startswith('timestamp'):
+        return 'date'
+    return None
+
+def _truncate_microseconds(value):
+    # 旧版 ODBC 驱动把 datetime2 读成字符串，原样交给目标库解析
+    return value.replace(microsecond=0) if isinstance(value, datetime.datetime) else value
+
+def _parse_datetime2(value):
+    # 旧版 ODBC 驱动把 datetime2 读成 'YYYY-MM-DD hh:mm:ss.fffffff'，截到微秒后解析（asyncpg 只接受 datetime）
+    if type(value) is not str:
+        return value
+    head, dot, fraction = value.partition('.')
+    return datetime.datetime.fromisoformat(f"{head}.{fraction[:6].ljust(6, '0')}" if dot else head)
+
+def _oracle_text_value(value):
+    # cx_Oracle 按 get_input_sizes 把 VARCHAR2 列绑定为字符串变量，只接受 str/bytes
+    if isinstance(value, (str, bytes)):
+        return value
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=' ')
+    if hasattr(value, 'read'):
+        # CLOB 等 LOB 对象
+        return value.read()
+    return str(value)
+
+# map_type 实际产生的 (源类型, 目标基本类型) 组合中驱动不能直接写入的，对应单个值的转换函数（值非 NULL 时调用）
+VALUE_CONVERTERS = {
+    # pyodbc native_uuid / psycopg2 register_uuid 返回 uuid.UUID，多数驱动只接受字符串
+    ('uniqueidentifier', 'UUID'): str,
+    ('uniqueidentifier', 'TEXT'): str,
+    ('uuid', 'TEXT'): str,
+    # pyodbc 把 money 读成 Decimal，PostgreSQL MONEY 列按文本写入（asyncpg 只接受 str）
+    ('money', 'MONEY'): str,
+    ('datetime2', 'TIMESTAMP'): _parse_datetime2,
+    # MySQL DATETIME 不带小数秒时会四舍五入到秒（可能进位到下一秒），与源库截断语义一致
+    ('datetime', 'DATETIME'): _truncate_microseconds,
+}
+
+def pick_value_converter(source_type, target_type):
+    # 按 (源类型, 目标类型) 选择单个值的转换函数，驱动已能正确处理的组合返回 None
+    if not source_type or not target_type:
+        return None
+    source_base = str(source_type).split('(')[0].strip().lower()
+    target_base = split_column_type(target_type)[0]
+    converter = VALUE_CONVERTERS.get((source_base, target_base))
+    if converter is None and target_base == 'VARCHAR2' and source_base not in CHECKSUM_TEXT_TYPES:
+        # Oracle 目标中 NUMBER/VARCHAR2/DATE 以外的源类型都映射为 VARCHAR2(255)
+        return _oracle_text_value
+    return converter
+
+def build_row_converter(columns_names, source_types, target_types):
+    # 每张表构建一次：按列选好转换函数，整批转换时只处理需要转换的列，不再逐值判断类型；
+    # 所有列都无需转换时返回 None，调用方直接写入原始批次
+    converters = tuple(pick_value_converter(source_types.get(c.lower()), target_types.get(c.lower()))
+                       for c in columns_names)
+    columns = tuple((i, converter) for i, converter in enumerate(converters) if converter is not None)
+    if not columns:
+        return None
+    
+    def convert(rows):
+        converted = []
+        for row in rows:
+            row = list(row)
+            for i, converter in columns:
+                value = row[i]
+                if value is not None:
+                    row[i] = converter(value)
+            converted.append(tuple(row))
+        return converted
+    return convert
+
+def split_key_range(low, high, parts):
+    # 把 [low, high] 均分为 parts 段，返回 (下界, 上界, 是否包含上界) 列表
+    bounds = [low]
+    for i in range(1, parts):
+        if isinstance(low, (float, decimal.Decimal)):
+            bound = low + (high - low) * i / parts
+        else:
+            bound = low + (high - low) * i // parts
+        if bound > bounds[-1] and bound < high:
+            bounds.append(bound)
+    ranges = [(bounds[i], bounds[i + 1], False) for i in range(len(bounds) - 1)]
+    ranges.append((bounds[-1], high, True))
+    return ranges
+
+def group_index_rows(rows):
+    # get_index_query 的结果（每列一行）合并为索引定义，主键排在最前面
+    indexes = {}
+    for index_name, is_primary, is_unique, column_name in rows:
+        index = indexes.setdefault(index_name, {
+            'name': index_name, 'primary': bool(is_primary), 'unique': bool(is_unique), 'columns': []
+        })
+        index['columns'].append(column_name)
+    return sorted(indexes.values(), key=lambda index: not index['primary'])
+
+def group_foreign_key_rows(rows):
+    foreign_keys = {}
+    for name, column_name, ref_table, ref_column in rows:
+        foreign_key = foreign_keys.setdefault(name, {
+            'name': name, 'columns': [], 'ref_table': ref_table.lower(), 'ref_columns': []
+        })
+        foreign_key['columns'].append(column_name)
+        foreign_key['ref_columns'].append(ref_column)
+    return list(foreign_keys.values())
+
+def group_row_estimates(rows):
+    # get_row_estimate_query 的结果转为 {小写表名: 行数}；没有统计信息（NULL/负数）或为 0 的表不计入，改用精确计数
+    return {table_name.lower(): int(rows) for table_name, rows in rows if rows and rows > 0}
 
 # 适配器基类
 class DatabaseAdapter:
+    bulk_strategy = 'executemany'  # 批量写入策略名称（用于日志和基准测试）
+    ping_query = 'SELECT 1'  # 连接池健康检查语句
+    parallel_index_build = False
+    
     def __init__(self):
         self.conn = None
         self.cursor = None
+        self.fast_load = False  # 快速加载配置：作为目标时减少日志/约束检查，结束时自动恢复
+        self.convert_seconds = 0.0  # 批量写入时客户端编码/类型转换的累计耗时（由驱动转换的适配器为 0）
+        self.connect_config = None  # 最近一次连接参数，断线重连时使用
     
     def connect(self, config):
         raise NotImplementedError
     
     def disconnect(self):
+        if self.fast_load and self.conn:
+            try:
+                self.end_fast_load_session()
+            except Exception as e:
+                logging.error(f"恢复会话设置失败: {str(e)}")
         if self.cursor:
             self.cursor.close()
         if self.conn:
             self.conn.close()
     
+    def begin_fast_load_session(self):
+        # 连接建立后调用，仅在 fast_load 时生效
+        pass
+    
+    def end_fast_load_session(self):
+        pass
+    
+    def commits_each_batch(self):
+        # bulk_insert 每批自行提交时返回 True：已写入的批次不能再回滚重放
+        return False
+    
+    def build_create_table_sql(self, table_name, column_defs):
+        return f"DROP TABLE IF EXISTS {table_name}; CREATE TABLE {table_name} ({', '.join(column_defs)})"
+    
+    def finish_fast_load(self, table_name):
+        # 表加载完成后恢复表级设置（如重新开启日志）
+        pass
+    
     def get_columns_query(self, table_name):
         raise NotImplementedError
     
+    def get_all_columns_query(self, table_names):
+        # 一次查询多张表的列：返回 (表名, 列名, 类型, 长度) 行，按表名和列顺序排序；返回 None 时逐表查询
+        return None
+    
+    def get_schema_fingerprint_query(self):
+        # 表或列定义变化时结果随之变化的查询，用于判断落盘的结构缓存是否作废；返回 None 时不落盘
+        return None
+    
+    def get_row_estimate_query(self, table_names):
+        # 按统计信息估算多张表的行数：返回 (表名, 行数) 行；返回 None 时逐表 COUNT(*)
+        return None
+    
+    def get_row_estimates(self, table_names):
+        estimates = {}
+        for i in range(0, len(table_names), SCHEMA_QUERY_CHUNK):
+            query = self.get_row_estimate_query(table_names[i:i + SCHEMA_QUERY_CHUNK])
+            if query is None:
+                break
+            self.cursor.execute(query)
+            estimates.update(group_row_estimates(self.cursor.fetchall()))
+        return estimates
+    
     def map_type(self, source_type, max_length):
         raise NotImplementedError
     
@@ -58,9 +335,219 @@ class DatabaseAdapter:
     
     def get_all_tables(self):
         raise NotImplementedError
+    
+    def create_stream_cursor(self, batch_size):
+        raise NotImplementedError
+    
+    def close_stream_cursor(self, cursor):
+        # 流式读取结束（含提前结束）时调用
+        cursor.close()
+    
+    def get_split_column_query(self, table_name):
+        raise NotImplementedError
+    
+    def get_split_column(self, table_name):
+        # 选取主键或索引的首列作为范围拆分列，查询结果按主键优先排序
+        self.cursor.execute(self.get_split_column_query(table_name))
+        for column_name, data_type in self.cursor.fetchall():
+            if classify_split_type(data_type):
+                return column_name
+        return None
+    
+    def get_index_query(self, table_name):
+        # 返回 (索引名, 是否主键, 是否唯一, 列名) 行，按索引名和列顺序排序
+        raise NotImplementedError
+    
+    def get_foreign_key_query(self, table_name):
+        # 返回 (约束名, 列名, 引用表, 引用列) 行，按约束名和列顺序排序
+        raise NotImplementedError
+    
+    def get_index_definitions(self, table_name):
+        self.cursor.execute(self.get_index_query(table_name))
+        return group_index_rows(self.cursor.fetchall())
+    
+    def get_foreign_keys(self, table_name):
+        self.cursor.execute(self.get_foreign_key_query(table_name))
+        return group_foreign_key_rows(self.cursor.fetchall())
+    
+    def stream_rows(self, query, batch_size=DEFAULT_BATCH_SIZE, params=None, sizer=None):
+        # 流式读取：返回列名和按批产出行的生成器，内存占用受 batch_size 约束；
+        # 传入 sizer（BatchSizer）时每批读取的行数取其当前值
+        if sizer is not None:
+            batch_size = sizer.rows
+        cursor = self.create_stream_cursor(batch_size)
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            # 命名游标在首次 fetch 之前没有 description
+            first_batch = cursor.fetchmany(batch_size)
+            columns = [desc[0] for desc in cursor.description]
+        except Exception:
+            self.close_stream_cursor(cursor)
+            raise
+        return columns, self._iter_batches(cursor, first_batch, batch_size, sizer)
+    
+    def _iter_batches(self, cursor, first_batch, batch_size, sizer=None):
+        try:
+            rows = first_batch
+            while rows:
+                yield rows
+                rows = cursor.fetchmany(sizer.rows if sizer is not None else batch_size)
+        finally:
+            self.close_stream_cursor(cursor)
+    
+    def stream_arrow(self, query, batch_size=DEFAULT_BATCH_SIZE, params=None, source_types=None):
+        # 列式读取：返回列名和按批产出 pyarrow.RecordBatch 的生成器。通用实现由行批次按列转换，
+        # 驱动能直接产出列式数据的适配器（PostgreSQL COPY TO、SQL Server arrow-odbc）覆盖此方法。
+        # 给出源列类型（{小写列名: 类型}）时各批次使用同一 schema，否则按每批的值推断
+        columns, batches = self.stream_rows(query, batch_size, params)
+        schema = arrow_schema(columns, source_types) if source_types else None
+        return columns, self._iter_record_batches(columns, batches, schema)
+    
+    def _iter_record_batches(self, columns, batches, schema=None):
+        try:
+            for batch in batches:
+                if schema is None:
+                    yield pa.RecordBatch.from_arrays([pa.array(values) for values in zip(*batch)], names=columns)
+                else:
+                    yield pa.RecordBatch.from_arrays(
+                        [arrow_array(values, field.type) for values, field in zip(zip(*batch), schema)], schema=schema)
+        finally:
+            batches.close()
+    
+    def write_arrow(self, table_name, columns, record_batch, column_types=None):
+        # 列式写入：通用实现转回行后批量写入，有列式批量接口的适配器覆盖此方法
+        start = time.perf_counter()
+        rows = list(zip(*(column.to_pylist() for column in record_batch.columns)))
+        self.convert_seconds += time.perf_counter() - start
+        self.bulk_insert(table_name, columns, rows, column_types)
+    
+    def commit(self):
+        self.conn.commit()
+    
+    def rollback(self):
+        self.conn.rollback()
+    
+    def is_transient_error(self, error):
+        # 死锁、锁等待超时、网络中断等重连/重试后可能成功的错误，由各驱动适配器按错误码判断
+        return False
+    
+    def reconnect(self):
+        # 丢弃当前连接，用原参数重新连接（目标端同时恢复快速加载会话设置）
+        if self.connect_config is None:
+            raise Exception("适配器没有保存连接参数，无法重连")
+        try:
+            self.disconnect()
+        except Exception:
+            pass
+        self.conn = None
+        self.cursor = None
+        self.connect(self.connect_config)
+        self.begin_fast_load_session()
+    
+    def ping(self):
+        # 执行一条最简单的查询，失败即视为连接已断开
+        self.cursor.execute(self.ping_query)
+        self.cursor.fetchall()
+    
+    def build_insert_sql(self, table_name, columns):
+        placeholders = self.get_placeholders(len(columns))
+        return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+    
+    def bulk_insert(self, table_name, columns, rows, column_types=None):
+        # 通用批量写入；column_types 为目标建表类型（map_type 结果），供子类做类型提示
+        self.cursor.executemany(self.build_insert_sql(table_name, columns), rows)
+    
+    def upsert_rows(self, table_name, columns, rows, key_columns, column_types=None):
+        # 按 key_columns 插入或更新（增量同步使用）
+        raise NotImplementedError
+    
+    def delete_rows(self, table_name, key_columns, keys):
+        markers = self.get_placeholders(len(key_columns)).split(', ')
+        where = ' AND '.join(f"{k} = {m}" for k, m in zip(key_columns, markers))
+        self.cursor.executemany(f"DELETE FROM {table_name} WHERE {where}", keys)
+    
+    def get_cdc_start_position(self, table_name, options):
+        # 全量迁移开始前记录 CDC 起点，之后的变更由 read_cdc_changes 读取
+        raise NotImplementedError("该数据库类型不支持 CDC 读取")
+    
+    def read_cdc_changes(self, table_name, position, options, batch_size=DEFAULT_BATCH_SIZE):
+        # 返回 (本次读取的结束位置, 按批产出 [('upsert'|'delete', {列名: 值}), ...] 的生成器)
+        raise NotImplementedError("该数据库类型不支持 CDC 读取")
+    
+    def confirm_cdc_position(self, table_name, position, options):
+        # 变更已写入目标后调用，需要服务端确认位置的数据库（如复制槽）在此推进
+        pass
+    
+    def table_exists(self, table_name):
+        try:
+            self.cursor.execute(f"SELECT 1 FROM {table_name} WHERE 1=0")
+            self.cursor.fetchall()
+            return True
+        except Exception:
+            self.conn.rollback()
+            return False
+    
+    def build_index_sql(self, table_name, index):
+        columns = ', '.join(index['columns'])
+        if index['primary']:
+            return f"ALTER TABLE {table_name} ADD CONSTRAINT pk_{table_name} PRIMARY KEY ({columns})"
+        # 源库索引名可能只在表内唯一，目标索引名加表名前缀
+        index_name = f"{table_name}_{index['name']}".lower()[:60]
+        unique = 'UNIQUE ' if index['unique'] else ''
+        return f"CREATE {unique}INDEX {index_name} ON {table_name} ({columns})"
+    
+    def build_foreign_key_sql(self, table_name, foreign_key):
+        constraint_name = f"fk_{table_name}_{foreign_key['name']}".lower()[:60]
+        return (f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint_name} "
+                f"FOREIGN KEY ({', '.join(foreign_key['columns'])}) "
+                f"REFERENCES {foreign_key['ref_table']} ({', '.join(foreign_key['ref_columns'])})")
+    
+    def prepare_index_transaction(self, config):
+        # 每个建索引事务开始时调用，设置只在该事务内有效（如 PostgreSQL 的 SET LOCAL maintenance_work_mem）
+        pass
+    
+    def create_unique_key(self, table_name, key_columns):
+        # 增量同步的 upsert 依赖目标表上的唯一键
+        index_name = f"ux_{table_name}_{'_'.join(key_columns)}"
+        self.cursor.execute(f"CREATE UNIQUE INDEX {index_name} ON {table_name} ({', '.join(key_columns)})")
+        self.commit()
+    
+    def build_merge_sql(self, table_name, columns, key_columns, source_select):
+        # SQL Server/Oracle 通用的 MERGE 语句，source_select 为单行参数化的源数据子查询
+        on_clause = ' AND '.join(f"t.{k} = s.{k}" for k in key_columns)
+        update_columns = [c for c in columns if c.lower() not in {k.lower() for k in key_columns}]
+        sql = f"MERGE INTO {table_name} t USING ({source_select}) s ON ({on_clause})"
+        if update_columns:
+            sql += f" WHEN MATCHED THEN UPDATE SET {', '.join(f't.{c} = s.{c}' for c in update_columns)}"
+        sql += (f" WHEN NOT MATCHED THEN INSERT ({', '.join(columns)})"
+                f" VALUES ({', '.join(f's.{c}' for c in columns)})")
+        return sql
+    
+    # 数据校验：每行按列规范化为文本（整数/布尔为十进制数字，日期精确到秒 'YYYY-MM-DD HH:MI:SS'，NULL 为 '~'），
+    # 以 '|' 连接后取 MD5 前 32 位作为行哈希，区间内行哈希求和；求和与行顺序无关，不同数据库的结果可以直接比较
+    def checksum_text(self, column, kind):
+        raise NotImplementedError
+    
+    def checksum_concat(self, parts):
+        raise NotImplementedError
+    
+    def checksum_sum(self, row_text):
+        raise NotImplementedError
+    
+    def build_checksum_query(self, table_name, columns, where):
+        # columns 为 [(列名, 类别)]，返回 (行数, 行哈希之和)
+        if not columns:
+            return f"SELECT COUNT(*), 0 FROM {table_name} WHERE {where}"
+        parts = [f"COALESCE({self.checksum_text(name, kind)}, '~')" for name, kind in columns]
+        return f"SELECT COUNT(*), {self.checksum_sum(self.checksum_concat(parts))} FROM {table_name} WHERE {where}"
 
 # SQL Server适配器（已修复database属性问题）
 class SQLServerAdapter(DatabaseAdapter):
+    bulk_strategy = 'fast_executemany'
+    
     def __init__(self):
         super().__init__()
         self.database = None  # 新增数据库名称存储
@@ -73,9 +560,21 @@ class SQLServerAdapter(DatabaseAdapter):
             f"UID={config['user']};"
             f"PWD={config['password']}"
         )
-        self.conn = pyodbc.connect(conn_str)
+        # 所有适配器统一关闭自动提交，写入由提交策略显式提交
+        self.conn = pyodbc.connect(conn_str, autocommit=False)
         self.cursor = self.conn.cursor()
         self.database = config['database']  # 存储数据库名称
+        self.conn_str = conn_str  # arrow-odbc 按列读取时另建连接使用
+    
+    def stream_arrow(self, query, batch_size=DEFAULT_BATCH_SIZE, params=None, source_types=None):
+        # 安装 arrow-odbc 时由 ODBC 驱动直接填充列式缓冲区，不经过 pyodbc 的逐行对象；只用于读取，
+        # 写入仍走 fast_executemany（arrow-odbc 的写入使用独立连接，无法纳入提交策略）
+        if arrow_odbc is None:
+            return super().stream_arrow(query, batch_size, params, source_types)
+        reader = arrow_odbc.read_arrow_batches_from_odbc(
+            query=query, connection_string=self.conn_str, batch_size=batch_size,
+            parameters=None if not params else [None if p is None else str(p) for p in params])
+        return reader.schema.names, (batch for batch in reader)
     
     def get_columns_query(self, table_name):
         return f"""
@@ -84,6 +583,30 @@ class SQLServerAdapter(DatabaseAdapter):
             WHERE TABLE_NAME = '{table_name}'
         """
     
+    def get_all_columns_query(self, table_names):
+        names = ', '.join(f"'{name}'" for name in table_names)
+        return f"""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_NAME IN ({names})
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """
+    
+    def get_schema_fingerprint_query(self):
+        # 增删列、改类型都会更新 modify_date
+        return "SELECT COUNT(*), MAX(modify_date) FROM sys.tables"
+    
+    def get_row_estimate_query(self, table_names):
+        # 堆或聚集索引（index_id 0/1）各分区行数之和，由元数据维护，无需扫描
+        names = ', '.join(f"'{name}'" for name in table_names)
+        return f"""
+            SELECT t.name, SUM(p.rows)
+            FROM sys.tables t
+            JOIN sys.partitions p ON p.object_id = t.object_id AND p.index_id IN (0, 1)
+            WHERE t.name IN ({names})
+            GROUP BY t.name
+        """
+    
     def map_type(self, source_type, max_length):
         type_map = {
             'int': 'INT',
@@ -101,7 +624,60 @@ class SQLServerAdapter(DatabaseAdapter):
         return type_map.get(source_type.lower(), 'TEXT')
     
     def get_placeholders(self, count):
-        return ', '.join(['%s'] * count)
+        # pyodbc 使用 qmark 参数风格
+        return ', '.join(['?'] * count)
+    
+    def get_split_column_query(self, table_name):
+        return f"""
+            SELECT c.name, t.name
+            FROM sys.indexes i
+            JOIN sys.index_columns ic
+                ON ic.object_id = i.object_id AND ic.index_id = i.index_id AND ic.key_ordinal = 1
+            JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            JOIN sys.types t ON t.user_type_id = c.user_type_id
+            WHERE i.object_id = OBJECT_ID('{table_name}')
+            ORDER BY i.is_primary_key DESC, i.is_unique DESC
+        """
+    
+    def get_index_query(self, table_name):
+        return f"""
+            SELECT i.name, i.is_primary_key, i.is_unique, c.name
+            FROM sys.indexes i
+            JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.object_id = OBJECT_ID('{table_name}') AND i.type > 0
+                AND i.is_hypothetical = 0 AND ic.is_included_column = 0
+            ORDER BY i.name, ic.key_ordinal
+        """
+    
+    def get_foreign_key_query(self, table_name):
+        return f"""
+            SELECT fk.name, pc.name, OBJECT_NAME(fk.referenced_object_id), rc.name
+            FROM sys.foreign_keys fk
+            JOIN sys.foreign_key_columns fkc ON fkc.constraint_object_id = fk.object_id
+            JOIN sys.columns pc ON pc.object_id = fkc.parent_object_id AND pc.column_id = fkc.parent_column_id
+            JOIN sys.columns rc ON rc.object_id = fkc.referenced_object_id AND rc.column_id = fkc.referenced_column_id
+            WHERE fk.parent_object_id = OBJECT_ID('{table_name}')
+            ORDER BY fk.name, fkc.constraint_column_id
+        """
+    
+    def checksum_text(self, column, kind):
+        if kind == 'date':
+            return f"CONVERT(VARCHAR(19), CAST({column} AS DATETIME2), 120)"
+        if kind == 'text':
+            return f"CAST({column} AS NVARCHAR(MAX))"
+        return f"CAST({column} AS VARCHAR(64))"
+    
+    def checksum_concat(self, parts):
+        if len(parts) == 1:
+            return f"CAST({parts[0]} AS NVARCHAR(MAX))"
+        separator = ", '|', "
+        return f"CAST(CONCAT({separator.join(parts)}) AS NVARCHAR(MAX))"
+    
+    def checksum_sum(self, row_text):
+        # 转为 UTF-8 再计算 MD5，与其他数据库的字节一致（需要 SQL Server 2019 及以上）
+        return (f"SUM(CAST(CAST(HASHBYTES('MD5', CAST({row_text} COLLATE Latin1_General_100_CI_AS_SC_UTF8 "
+                f"AS VARCHAR(MAX))) AS BINARY(4)) AS BIGINT))")
     
     def get_all_tables(self):
         self.cursor.execute("""
@@ -113,14 +689,276 @@ class SQLServerAdapter(DatabaseAdapter):
                 TABLE_CATALOG = ?
         """, (self.database,))  # 使用存储的数据库名称
         return [row[0].lower() for row in self.cursor.fetchall()]
+    
+    def create_stream_cursor(self, batch_size):
+        # pyodbc 默认逐行从服务端拉取结果，arraysize 决定 fetchmany 的默认批量
+        cursor = self.conn.cursor()
+        cursor.arraysize = batch_size
+        return cursor
+    
+    # 通信链路失败、连接失败/断开、死锁牺牲者、查询超时
+    TRANSIENT_SQLSTATES = {'08S01', '08001', '08003', '08004', '08007', '40001', 'HYT00', 'HYT01'}
+    
+    def is_transient_error(self, error):
+        if not isinstance(error, pyodbc.Error) or not error.args:
+            return False
+        # 死锁（1205）在部分驱动版本中以通用 SQLSTATE 返回，按原生错误号再判断一次
+        return error.args[0] in self.TRANSIENT_SQLSTATES or '(1205)' in str(error)
+    
+    def build_insert_sql(self, table_name, columns):
+        # 快速加载：TABLOCK 使堆表插入在 SIMPLE/BULK_LOGGED 恢复模式下走最小日志（并发写入会互相等待表锁）
+        hint = ' WITH (TABLOCK)' if self.fast_load else ''
+        placeholders = self.get_placeholders(len(columns))
+        return f"INSERT INTO {table_name}{hint} ({', '.join(columns)}) VALUES ({placeholders})"
+    
+    def get_input_sizes(self, column_types):
+        # fast_executemany 按参数类型预分配缓冲区，字符串列给出长度可避免按最大长度分配
+        sizes = []
+        for col_type in column_types:
+            base, length = split_column_type(col_type)
+            if base in ('VARCHAR', 'NVARCHAR', 'CHAR', 'NCHAR'):
+                sizes.append((pyodbc.SQL_WVARCHAR, length, 0))
+            elif base in ('TEXT', 'XML'):
+                sizes.append((pyodbc.SQL_WLONGVARCHAR, 0, 0))
+            elif base in ('INT', 'INTEGER'):
+                sizes.append((pyodbc.SQL_INTEGER, 0, 0))
+            elif base == 'BIGINT':
+                sizes.append((pyodbc.SQL_BIGINT, 0, 0))
+            elif base in ('DOUBLE PRECISION', 'FLOAT'):
+                sizes.append((pyodbc.SQL_DOUBLE, 0, 0))
+            elif base in ('BOOLEAN', 'BIT'):
+                sizes.append((pyodbc.SQL_BIT, 0, 0))
+            elif base in ('TIMESTAMP', 'DATETIME', 'DATETIME2'):
+                sizes.append((pyodbc.SQL_TYPE_TIMESTAMP, 27, 7))
+            elif base in ('BYTEA', 'VARBINARY', 'IMAGE'):
+                sizes.append((pyodbc.SQL_VARBINARY, 0, 0))
+            else:
+                sizes.append(None)
+        return sizes
+    
+    def bulk_insert(self, table_name, columns, rows, column_types=None):
+        self.cursor.fast_executemany = True
+        if column_types:
+            self.cursor.setinputsizes(self.get_input_sizes(column_types))
+        self.cursor.executemany(self.build_insert_sql(table_name, columns), rows)
+    
+    def get_cdc_start_position(self, table_name, options):
+        self.cursor.execute("SELECT sys.fn_cdc_get_max_lsn()")
+        return self.cursor.fetchone()[0]
+    
+    def read_cdc_changes(self, table_name, position, options, batch_size=DEFAULT_BATCH_SIZE):
+        # 读取 cdc.fn_cdc_get_all_changes_<捕获实例>，区间为 (position, 当前最大 LSN]
+        capture_instance = options.get('capture_instance') or f"dbo_{table_name}"
+        self.cursor.execute(
+            "SELECT sys.fn_cdc_get_min_lsn(?), sys.fn_cdc_get_max_lsn(), sys.fn_cdc_increment_lsn(?)",
+            (capture_instance, position)
+        )
+        min_lsn, max_lsn, from_lsn = self.cursor.fetchone()
+        if min_lsn is None or min_lsn == bytes(10):
+            raise Exception(f"表 {table_name} 未启用 CDC（捕获实例 {capture_instance}）")
+        if from_lsn < min_lsn:
+            raise Exception(f"表 {table_name} 的 CDC 变更已被清理，需要重新全量迁移")
+        if from_lsn > max_lsn:
+            return position, (changes for changes in ())
+        query = (f"SELECT * FROM cdc.fn_cdc_get_all_changes_{capture_instance}(?, ?, N'all') "
+                 f"ORDER BY __$start_lsn, __$seqval")
+        columns, batches = self.stream_rows(query, batch_size, (from_lsn, max_lsn))
+        return max_lsn, self._cdc_events(columns, batches)
+    
+    def _cdc_events(self, columns, batches):
+        # __$operation: 1=删除 2=插入 4=更新后（'all' 模式不返回更新前镜像）
+        op_index = columns.index('__$operation')
+        data_indexes = [i for i, c in enumerate(columns) if not c.startswith('__$')]
+        for batch in batches:
+            yield [
+                ('delete' if row[op_index] == 1 else 'upsert', {columns[i]: row[i] for i in data_indexes})
+                for row in batch
+            ]
+    
+    def upsert_rows(self, table_name, columns, rows, key_columns, column_types=None):
+        source_select = "SELECT " + ', '.join(f"? AS {c}" for c in columns)
+        self.cursor.fast_executemany = True
+        if column_types:
+            self.cursor.setinputsizes(self.get_input_sizes(column_types))
+        self.cursor.executemany(self.build_merge_sql(table_name, columns, key_columns, source_select) + ';', rows)
+
+# PostgreSQL 文本表示（未做 COPY 转义），COPY text 格式和 asyncpg 写入文本列共用
+def _pg_text_value(value):
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # bytea 十六进制格式
+        return '\\x' + bytes(value).hex()
+    if isinstance(value, float):
+        if value != value:
+            return 'NaN'
+        if value in (float('inf'), float('-inf')):
+            return 'Infinity' if value > 0 else '-Infinity'
+        return repr(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+# PostgreSQL COPY 编码（text 格式）
+def _pg_copy_text_value(value):
+    if value is None:
+        return '\\N'
+    if not isinstance(value, str):
+        text = _pg_text_value(value)
+        # bytea 的反斜杠在 COPY 文本中需再转义一次
+        return '\\' + text if isinstance(value, (bytes, bytearray, memoryview)) else text
+    return (value.replace('\\', '\\\\')
+                .replace('\t', '\\t')
+                .replace('\n', '\\n')
+                .replace('\r', '\\r'))
+
+def _pg_copy_text_str(value):
+    # 字符串列的快速路径；源类型映射为 TEXT 的非字符串值交给通用编码
+    if type(value) is not str:
+        return _pg_copy_text_value(value)
+    return (value.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+def _pg_copy_text_bool(value):
+    if type(value) is not bool:
+        return _pg_copy_text_value(value)
+    return 't' if value else 'f'
+
+def _pg_copy_text_timestamp(value):
+    if type(value) is not datetime.datetime:
+        return _pg_copy_text_value(value)
+    return value.isoformat(sep=' ')
+
+# COPY text 格式按目标列类型选择的编码函数（值非 NULL 时调用），未列出的类型使用通用编码
+_PG_TEXT_ENCODERS = {
+    'SMALLINT': str,
+    'INT': str,
+    'INTEGER': str,
+    'BIGINT': str,
+    'BOOLEAN': _pg_copy_text_bool,
+    'TEXT': _pg_copy_text_str,
+    'VARCHAR': _pg_copy_text_str,
+    'XML': _pg_copy_text_str,
+    'TIMESTAMP': _pg_copy_text_timestamp,
+}
+
+def _pg_text_encoders(column_types, count):
+    if not column_types:
+        return (_pg_copy_text_value,) * count
+    return tuple(_PG_TEXT_ENCODERS.get(split_column_type(pg_type)[0], _pg_copy_text_value) for pg_type in column_types)
+
+# PostgreSQL COPY 编码（binary 格式），按目标列类型选择编码函数
+_PG_EPOCH_DATETIME = datetime.datetime(2000, 1, 1)
+_PG_EPOCH_DATE = datetime.date(2000, 1, 1)
+
+def _pg_encode_timestamp(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    delta = value - _PG_EPOCH_DATETIME
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return struct.pack('!q', micros)
+
+def _pg_encode_date(value):
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return struct.pack('!i', (value - _PG_EPOCH_DATE).days)
+
+def _pg_encode_uuid(value):
+    return value.bytes if isinstance(value, uuid.UUID) else uuid.UUID(str(value)).bytes
+
+_PG_BINARY_ENCODERS = {
+    'SMALLINT': lambda v: struct.pack('!h', int(v)),
+    'INT': lambda v: struct.pack('!i', int(v)),
+    'INTEGER': lambda v: struct.pack('!i', int(v)),
+    'BIGINT': lambda v: struct.pack('!q', int(v)),
+    'DOUBLE PRECISION': lambda v: struct.pack('!d', float(v)),
+    'REAL': lambda v: struct.pack('!f', float(v)),
+    'BOOLEAN': lambda v: b'\x01' if v else b'\x00',
+    'TEXT': lambda v: str(v).encode('utf-8'),
+    'VARCHAR': lambda v: str(v).encode('utf-8'),
+    'XML': lambda v: str(v).encode('utf-8'),
+    'BYTEA': bytes,
+    'UUID': _pg_encode_uuid,
+    'TIMESTAMP': _pg_encode_timestamp,
+    'DATE': _pg_encode_date,
+}
+
+_PG_COPY_BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+
+# COPY TO 的 CSV 输出按列类型 OID 解析为 Arrow 类型；numeric/uuid/json 等保留为字符串（不丢精度），
+# 含其他类型（如 bytea）的查询退回通用的逐行读取
+_PG_ARROW_TYPE_NAMES = {
+    16: 'bool_', 20: 'int64', 21: 'int16', 23: 'int32', 700: 'float32', 701: 'float64', 1082: 'date32',
+    25: 'string', 1042: 'string', 1043: 'string', 1700: 'string', 2950: 'string', 114: 'string',
+    3802: 'string', 142: 'string', 1184: 'string',
+}
+
+def _pg_arrow_type(type_oid):
+    if type_oid == 1114:
+        return pa.timestamp('us')
+    name = _PG_ARROW_TYPE_NAMES.get(type_oid)
+    return getattr(pa, name)() if name else None
+
+def _pg_binary_encoders(column_types):
+    # 任一列类型没有二进制编码器时返回 None，由调用方回退到 text 格式
+    if not column_types:
+        return None
+    encoders = []
+    for pg_type in column_types:
+        encoder = _PG_BINARY_ENCODERS.get(split_column_type(pg_type)[0])
+        if encoder is None:
+            return None
+        encoders.append(encoder)
+    return encoders
 
 # PostgreSQL适配器
 class PostgreSQLAdapter(DatabaseAdapter):
+    bulk_strategy = 'copy'
+    parallel_index_build = True  # 同一张表的多个 CREATE INDEX 可在不同会话中并发执行
+    
+    def __init__(self):
+        super().__init__()
+        self.copy_format = 'text'  # COPY 格式：text 或 binary
+    
     def connect(self, config):
         self.conn = psycopg2.connect(**config)
-        self.conn.autocommit = True
+        self.conn.autocommit = False
         self.cursor = self.conn.cursor()
     
+    # 序列化失败、死锁、锁不可用、服务端关闭/重启、连接数已满
+    TRANSIENT_PGCODES = {'40001', '40P01', '55P03', '57P01', '57P02', '57P03', '53300'}
+    
+    def is_transient_error(self, error):
+        # OperationalError/InterfaceError 包括连接断开和服务端异常终止；08 类为连接异常
+        if isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            return True
+        pgcode = getattr(error, 'pgcode', None) or ''
+        return pgcode in self.TRANSIENT_PGCODES or pgcode.startswith('08')
+    
+    def begin_fast_load_session(self):
+        if self.fast_load:
+            self.cursor.execute("SET synchronous_commit = off")
+            self.conn.commit()
+    
+    def end_fast_load_session(self):
+        self.conn.rollback()
+        self.cursor.execute("RESET synchronous_commit")
+        self.conn.commit()
+    
+    def build_create_table_sql(self, table_name, column_defs):
+        # 快速加载：UNLOGGED 表不写 WAL，加载完成后 SET LOGGED
+        unlogged = 'UNLOGGED ' if self.fast_load else ''
+        return f"DROP TABLE IF EXISTS {table_name}; CREATE {unlogged}TABLE {table_name} ({', '.join(column_defs)})"
+    
+    def finish_fast_load(self, table_name):
+        if self.fast_load:
+            self.cursor.execute(f"ALTER TABLE {table_name} SET LOGGED")
+            self.conn.commit()
+    
     def get_columns_query(self, table_name):
         return f"""
             SELECT column_name, data_type, character_maximum_length
@@ -128,12 +966,93 @@ class PostgreSQLAdapter(DatabaseAdapter):
             WHERE table_name = '{table_name}'
         """
     
+    def get_all_columns_query(self, table_names):
+        names = ', '.join(f"'{name}'" for name in table_names)
+        return f"""
+            SELECT table_name, column_name, data_type, character_maximum_length
+            FROM information_schema.columns
+            WHERE table_name IN ({names})
+            ORDER BY table_name, ordinal_position
+        """
+    
+    def get_schema_fingerprint_query(self):
+        # PostgreSQL 目录中没有 DDL 时间，按用户表的列定义计算摘要
+        return """
+            SELECT count(*), md5(string_agg(c.oid || '.' || a.attname || ':' || a.atttypid || ':' || a.atttypmod,
+                                            ',' ORDER BY c.oid, a.attnum))
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE c.relkind IN ('r', 'p') AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+        """
+    
+    def get_row_estimate_query(self, table_names):
+        # reltuples 由 VACUUM/ANALYZE 更新，从未分析过的表为 -1（旧版本为 0），按 search_path 可见的表匹配
+        names = ', '.join(f"'{name}'" for name in table_names)
+        return f"""
+            SELECT c.relname, c.reltuples::bigint
+            FROM pg_class c
+            WHERE c.relkind = 'r' AND c.relname IN ({names}) AND pg_table_is_visible(c.oid)
+        """
+    
     def map_type(self, source_type, max_length):
-        return SQLServerAdapter().map_type(source_type, max_length)
+        # 类型映射与 SQL Server 适配器相同，直接复用其方法，不为每列创建适配器实例
+        return SQLServerAdapter.map_type(self, source_type, max_length)
     
     def get_placeholders(self, count):
         return ', '.join(['%s'] * count)
     
+    def get_split_column_query(self, table_name):
+        return f"""
+            SELECT a.attname, format_type(a.atttypid, NULL)
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = '{table_name}'::regclass
+            ORDER BY i.indisprimary DESC, i.indisunique DESC
+        """
+    
+    def get_index_query(self, table_name):
+        # 表达式索引和部分索引无法按列重建，跳过
+        return f"""
+            SELECT ic.relname, i.indisprimary, i.indisunique, a.attname
+            FROM pg_index i
+            JOIN pg_class ic ON ic.oid = i.indexrelid
+            JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord) ON k.ord <= i.indnkeyatts
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE i.indrelid = '{table_name}'::regclass AND i.indexprs IS NULL AND i.indpred IS NULL
+            ORDER BY ic.relname, k.ord
+        """
+    
+    def get_foreign_key_query(self, table_name):
+        return f"""
+            SELECT con.conname, a.attname, cl.relname, ra.attname
+            FROM pg_constraint con
+            JOIN LATERAL unnest(con.conkey, con.confkey) WITH ORDINALITY AS k(attnum, refattnum, ord) ON true
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+            JOIN pg_class cl ON cl.oid = con.confrelid
+            JOIN pg_attribute ra ON ra.attrelid = con.confrelid AND ra.attnum = k.refattnum
+            WHERE con.conrelid = '{table_name}'::regclass AND con.contype = 'f'
+            ORDER BY con.conname, k.ord
+        """
+    
+    def prepare_index_transaction(self, config):
+        # SET LOCAL 随事务提交/回滚失效：某个索引失败回滚后不影响后续索引，也不会留在归还连接池的连接上
+        if config.get('index_maintenance_work_mem'):
+            self.cursor.execute(f"SET LOCAL maintenance_work_mem = '{config['index_maintenance_work_mem']}'")
+    
+    def checksum_text(self, column, kind):
+        if kind == 'date':
+            return f"to_char({column}, 'YYYY-MM-DD HH24:MI:SS')"
+        if kind == 'bool':
+            return f"{column}::int::text"
+        return f"{column}::text"
+    
+    def checksum_concat(self, parts):
+        return " || '|' || ".join(parts)
+    
+    def checksum_sum(self, row_text):
+        return f"sum(('x' || substr(md5({row_text}), 1, 8))::bit(32)::bigint)"
+    
     def get_all_tables(self):
         self.cursor.execute("""
             SELECT table_name 
@@ -143,16 +1062,227 @@ class PostgreSQLAdapter(DatabaseAdapter):
                 table_type = 'BASE TABLE'
         """)
         return [row[0].lower() for row in self.cursor.fetchall()]
+    
+    def create_stream_cursor(self, batch_size):
+        # 命名游标即服务端游标；withhold 使游标在读取期间的事务提交后仍可使用
+        cursor = self.conn.cursor(name=f"stream_{uuid.uuid4().hex}", withhold=True)
+        cursor.itersize = batch_size
+        return cursor
+    
+    def copy_rows(self, table_name, columns, rows, column_types=None):
+        # 通过 COPY FROM STDIN 批量导入，一批数据只需一次往返
+        start = time.perf_counter()
+        encoders = _pg_binary_encoders(column_types) if self.copy_format == 'binary' else None
+        column_list = ', '.join(columns)
+        if encoders is not None:
+            buf = io.BytesIO()
+            buf.write(_PG_COPY_BINARY_HEADER)
+            field_count = struct.pack('!h', len(columns))
+            for row in rows:
+                buf.write(field_count)
+                for value, encoder in zip(row, encoders):
+                    if value is None:
+                        buf.write(b'\xff\xff\xff\xff')
+                    else:
+                        data = encoder(value)
+                        buf.write(struct.pack('!i', len(data)))
+                        buf.write(data)
+            buf.write(b'\xff\xff')
+            sql = f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT binary)"
+        else:
+            encoders = _pg_text_encoders(column_types, len(columns))
+            buf = io.StringIO()
+            for row in rows:
+                buf.write('\t'.join(['\\N' if v is None else encode(v) for v, encode in zip(row, encoders)]))
+                buf.write('\n')
+            sql = f"COPY {table_name} ({column_list}) FROM STDIN"
+        buf.seek(0)
+        self.convert_seconds += time.perf_counter() - start
+        self.cursor.copy_expert(sql, buf)
+    
+    def bulk_insert(self, table_name, columns, rows, column_types=None):
+        self.copy_rows(table_name, columns, rows, column_types)
+    
+    def stream_arrow(self, query, batch_size=DEFAULT_BATCH_SIZE, params=None, source_types=None):
+        # COPY (查询) TO STDOUT 的 CSV 输出经管道交给 pyarrow 的流式 CSV 解析器，由 C++ 直接生成列式批次
+        if params:
+            query = self.cursor.mogrify(query, params).decode()
+        self.cursor.execute(f"SELECT * FROM ({query}) q LIMIT 0")
+        columns = [desc[0] for desc in self.cursor.description]
+        arrow_types = [_pg_arrow_type(desc[1]) for desc in self.cursor.description]
+        if None in arrow_types:
+            return super().stream_arrow(query, batch_size, source_types=source_types)
+        read_fd, write_fd = os.pipe()
+        errors = []
+        
+        def produce():
+            try:
+                with os.fdopen(write_fd, 'wb') as output:
+                    self.conn.cursor().copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", output)
+            except Exception as e:
+                errors.append(e)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        source = os.fdopen(read_fd, 'rb')
+        if not source.peek(1):
+            # 空结果集：CSV 解析器不接受空输入
+            source.close()
+            producer.join()
+            if errors:
+                raise errors[0]
+            return columns, (record_batch for record_batch in ())
+        try:
+            reader = pa_csv.open_csv(
+                source,
+                read_options=pa_csv.ReadOptions(column_names=columns),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=dict(zip(columns, arrow_types)), null_values=[''], strings_can_be_null=True,
+                    quoted_strings_can_be_null=False, true_values=['t'], false_values=['f']))
+        except Exception:
+            source.close()
+            producer.join()
+            if errors:
+                raise errors[0]
+            raise
+        return columns, self._iter_copy_batches(reader, source, producer, errors, batch_size)
+    
+    def _iter_copy_batches(self, reader, source, producer, errors, batch_size):
+        # CSV 解析按字节块产出批次，这里再按 batch_size 切分；提前结束时取消 COPY，连接归还时回滚
+        finished = False
+        try:
+            for record_batch in reader:
+                for offset in range(0, record_batch.num_rows, batch_size):
+                    yield record_batch.slice(offset, batch_size)
+            finished = True
+        finally:
+            if not finished and producer.is_alive():
+                self.conn.cancel()
+            source.close()
+            producer.join()
+        if errors:
+            raise errors[0]
+    
+    def write_arrow(self, table_name, columns, record_batch, column_types=None):
+        # 列式批次由 pyarrow 直接编码为 CSV 后 COPY FROM，不生成逐行对象；二进制列的 CSV 编码与 bytea 不兼容，退回逐行写入
+        if any(pa.types.is_binary(field.type) or pa.types.is_large_binary(field.type)
+               for field in record_batch.schema):
+            return super().write_arrow(table_name, columns, record_batch, column_types)
+        start = time.perf_counter()
+        buf = io.BytesIO()
+        pa_csv.write_csv(record_batch, buf, pa_csv.WriteOptions(include_header=False))
+        buf.seek(0)
+        self.convert_seconds += time.perf_counter() - start
+        self.cursor.copy_expert(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+    
+    def get_cdc_start_position(self, table_name, options):
+        # 复制槽创建时刻即为一致性起点；上次全量中断遗留的同名槽先删除
+        slot = options.get('slot') or f"sync_table_{table_name}"
+        self.cursor.execute("SELECT 1 FROM pg_replication_slots WHERE slot_name = %s", (slot,))
+        if self.cursor.fetchone():
+            self.cursor.execute("SELECT pg_drop_replication_slot(%s)", (slot,))
+        self.cursor.execute("SELECT lsn::text FROM pg_create_logical_replication_slot(%s, 'wal2json')", (slot,))
+        position = self.cursor.fetchone()[0]
+        self.conn.commit()
+        return position
+    
+    def read_cdc_changes(self, table_name, position, options, batch_size=DEFAULT_BATCH_SIZE):
+        # peek 读取到当前 WAL 位置为止的变更，确认写入目标后再推进复制槽（至少一次语义）
+        slot = options.get('slot') or f"sync_table_{table_name}"
+        self.cursor.execute("SELECT pg_current_wal_lsn()::text")
+        upto_lsn = self.cursor.fetchone()[0]
+        query = """
+            SELECT data FROM pg_logical_slot_peek_changes(
+                %s, %s::pg_lsn, NULL, 'format-version', '2', 'add-tables', %s
+            )
+        """
+        schema = options.get('schema', 'public')
+        columns, batches = self.stream_rows(query, batch_size, (slot, upto_lsn, f"{schema}.{table_name}"))
+        return upto_lsn, self._wal2json_events(batches)
+    
+    def _wal2json_events(self, batches):
+        for batch in batches:
+            changes = []
+            for (data,) in batch:
+                change = json.loads(data)
+                action = change.get('action')
+                if action in ('I', 'U'):
+                    changes.append(('upsert', {c['name']: c['value'] for c in change['columns']}))
+                elif action == 'D':
+                    changes.append(('delete', {c['name']: c['value'] for c in change['identity']}))
+            if changes:
+                yield changes
+    
+    def confirm_cdc_position(self, table_name, position, options):
+        slot = options.get('slot') or f"sync_table_{table_name}"
+        self.cursor.execute("SELECT pg_replication_slot_advance(%s, %s::pg_lsn)", (slot, position))
+        self.conn.commit()
+    
+    def upsert_rows(self, table_name, columns, rows, key_columns, column_types=None):
+        update_columns = [c for c in columns if c.lower() not in {k.lower() for k in key_columns}]
+        conflict_action = (
+            "DO UPDATE SET " + ', '.join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+            if update_columns else "DO NOTHING"
+        )
+        sql = (f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES %s "
+               f"ON CONFLICT ({', '.join(key_columns)}) {conflict_action}")
+        psycopg2.extras.execute_values(self.cursor, sql, rows, page_size=len(rows) or 1)
 
 # MySQL适配器
 class MySQLAdapter(DatabaseAdapter):
+    bulk_strategy = 'multi_row_insert'
+    
+    def __init__(self):
+        super().__init__()
+        self.rows_per_statement = 500  # 单条 INSERT 携带的行数，受 max_allowed_packet 限制
+    
     def connect(self, config):
         self.conn = mysql.connector.connect(**config)
+        self.conn.autocommit = False
         self.cursor = self.conn.cursor(buffered=True)
     
+    # 锁等待超时、死锁、连接数已满、网络读写错误、无法连接、server has gone away、连接丢失
+    TRANSIENT_ERRNOS = {1205, 1213, 1040, 1158, 1159, 1160, 1161, 2003, 2006, 2013, 2055}
+    
+    def is_transient_error(self, error):
+        return getattr(error, 'errno', None) in self.TRANSIENT_ERRNOS
+    
+    def begin_fast_load_session(self):
+        if self.fast_load:
+            self.cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+    
+    def end_fast_load_session(self):
+        self.cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1")
+    
     def get_columns_query(self, table_name):
         return f"SHOW FULL COLUMNS FROM {table_name}"
     
+    def get_all_columns_query(self, table_names):
+        # 与 SHOW FULL COLUMNS 的前三列（Field, Type, Collation）取值一致
+        names = ', '.join(f"'{name}'" for name in table_names)
+        return f"""
+            SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, COLLATION_NAME
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({names})
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """
+    
+    def get_schema_fingerprint_query(self):
+        return """
+            SELECT COUNT(*), SUM(CRC32(CONCAT_WS(',', TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, ORDINAL_POSITION)))
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+        """
+    
+    def get_row_estimate_query(self, table_names):
+        # InnoDB 的 TABLE_ROWS 是采样估算值，误差可能达 40% 以上，只用于进度和调度
+        names = ', '.join(f"'{name}'" for name in table_names)
+        return f"""
+            SELECT TABLE_NAME, TABLE_ROWS
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({names})
+        """
+    
     def map_type(self, source_type, max_length):
         mappings = {
             'int': 'INT',
@@ -168,16 +1298,96 @@ class MySQLAdapter(DatabaseAdapter):
     def get_placeholders(self, count):
         return ', '.join(['%s'] * count)
     
+    def get_split_column_query(self, table_name):
+        return f"""
+            SELECT s.COLUMN_NAME, c.DATA_TYPE
+            FROM information_schema.STATISTICS s
+            JOIN information_schema.COLUMNS c
+                ON c.TABLE_SCHEMA = s.TABLE_SCHEMA AND c.TABLE_NAME = s.TABLE_NAME
+                AND c.COLUMN_NAME = s.COLUMN_NAME
+            WHERE s.TABLE_SCHEMA = DATABASE() AND s.TABLE_NAME = '{table_name}' AND s.SEQ_IN_INDEX = 1
+            ORDER BY s.INDEX_NAME = 'PRIMARY' DESC, s.NON_UNIQUE
+        """
+    
+    def get_index_query(self, table_name):
+        return f"""
+            SELECT INDEX_NAME, INDEX_NAME = 'PRIMARY', NON_UNIQUE = 0, COLUMN_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table_name}' AND COLUMN_NAME IS NOT NULL
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """
+    
+    def get_foreign_key_query(self, table_name):
+        return f"""
+            SELECT CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table_name}'
+                AND REFERENCED_TABLE_NAME IS NOT NULL
+            ORDER BY CONSTRAINT_NAME, ORDINAL_POSITION
+        """
+    
+    def checksum_text(self, column, kind):
+        # 不用 DATE_FORMAT：带参数执行时格式串中的 % 会被当作占位符
+        if kind == 'date':
+            return f"CAST(CAST({column} AS DATETIME) AS CHAR)"
+        if kind == 'bool':
+            return f"CAST({column} + 0 AS CHAR)"
+        if kind == 'text':
+            return column
+        return f"CAST({column} AS CHAR)"
+    
+    def checksum_concat(self, parts):
+        return f"CONCAT_WS('|', {', '.join(parts)})"
+    
+    def checksum_sum(self, row_text):
+        return f"SUM(CAST(CONV(SUBSTRING(MD5({row_text}), 1, 8), 16, 10) AS UNSIGNED))"
+    
     def get_all_tables(self):
         self.cursor.execute("SHOW TABLES")
         return [row[0].lower() for row in self.cursor.fetchall()]
+    
+    def create_stream_cursor(self, batch_size):
+        # 非缓冲游标：结果集留在服务端，按需读取
+        return self.conn.cursor(buffered=False)
+    
+    def close_stream_cursor(self, cursor):
+        # 写入出错或取消导致提前结束时结果集还有未读的行，直接关闭会报 "Unread result found" 并覆盖原来的异常；
+        # 先读完丢弃剩余结果（连接才能继续使用），仍失败时只记录日志
+        try:
+            self.conn.consume_results()
+            cursor.close()
+        except Exception as e:
+            logging.error(f"关闭流式游标失败: {str(e)}")
+    
+    def bulk_insert(self, table_name, columns, rows, column_types=None):
+        self._insert_multi_row(table_name, columns, rows)
+    
+    def upsert_rows(self, table_name, columns, rows, key_columns, column_types=None):
+        update_columns = [c for c in columns if c.lower() not in {k.lower() for k in key_columns}] or key_columns[:1]
+        suffix = " ON DUPLICATE KEY UPDATE " + ', '.join(f"{c} = VALUES({c})" for c in update_columns)
+        self._insert_multi_row(table_name, columns, rows, suffix)
+    
+    def _insert_multi_row(self, table_name, columns, rows, suffix=''):
+        # 多行 INSERT ... VALUES (...),(...)，每条语句写入 rows_per_statement 行
+        row_placeholder = f"({self.get_placeholders(len(columns))})"
+        prefix = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES "
+        for i in range(0, len(rows), self.rows_per_statement):
+            start = time.perf_counter()
+            chunk = rows[i:i+self.rows_per_statement]
+            params = [value for row in chunk for value in row]
+            self.convert_seconds += time.perf_counter() - start
+            self.cursor.execute(prefix + ', '.join([row_placeholder] * len(chunk)) + suffix, params)
 
 # Oracle适配器
 class OracleAdapter(DatabaseAdapter):
+    bulk_strategy = 'array_dml'
+    ping_query = 'SELECT 1 FROM dual'
+    
     def connect(self, config):
         self.conn = cx_Oracle.connect(
             f"{config['user']}/{config['password']}@{config['host']}/{config['service_name']}"
         )
+        self.conn.autocommit = False
         self.cursor = self.conn.cursor()
     
     def get_columns_query(self, table_name):
@@ -187,6 +1397,23 @@ class OracleAdapter(DatabaseAdapter):
             WHERE TABLE_NAME = '{table_name.upper()}'
         """
     
+    def get_all_columns_query(self, table_names):
+        names = ', '.join(f"'{name.upper()}'" for name in table_names)
+        return f"""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, DATA_LENGTH
+            FROM ALL_TAB_COLUMNS
+            WHERE TABLE_NAME IN ({names})
+            ORDER BY TABLE_NAME, COLUMN_ID
+        """
+    
+    def get_schema_fingerprint_query(self):
+        return "SELECT COUNT(*), MAX(LAST_DDL_TIME) FROM ALL_OBJECTS WHERE OBJECT_TYPE = 'TABLE'"
+    
+    def get_row_estimate_query(self, table_names):
+        # NUM_ROWS 来自最近一次统计信息收集，未收集过为 NULL
+        names = ', '.join(f"'{name.upper()}'" for name in table_names)
+        return f"SELECT TABLE_NAME, NUM_ROWS FROM ALL_TABLES WHERE TABLE_NAME IN ({names})"
+    
     def map_type(self, source_type, max_length):
         return {
             'NUMBER': 'NUMBER',
@@ -197,6 +1424,61 @@ class OracleAdapter(DatabaseAdapter):
     def get_placeholders(self, count):
         return ', '.join([':{}'.format(i+1) for i in range(count)])
     
+    def get_split_column_query(self, table_name):
+        return f"""
+            SELECT ic.COLUMN_NAME, tc.DATA_TYPE
+            FROM ALL_IND_COLUMNS ic
+            JOIN ALL_TAB_COLUMNS tc
+                ON tc.OWNER = ic.TABLE_OWNER AND tc.TABLE_NAME = ic.TABLE_NAME
+                AND tc.COLUMN_NAME = ic.COLUMN_NAME
+            JOIN ALL_INDEXES ix ON ix.OWNER = ic.INDEX_OWNER AND ix.INDEX_NAME = ic.INDEX_NAME
+            LEFT JOIN ALL_CONSTRAINTS con
+                ON con.OWNER = ix.TABLE_OWNER AND con.INDEX_NAME = ix.INDEX_NAME AND con.CONSTRAINT_TYPE = 'P'
+            WHERE ic.TABLE_NAME = '{table_name.upper()}' AND ic.COLUMN_POSITION = 1
+            ORDER BY CASE WHEN con.CONSTRAINT_TYPE = 'P' THEN 0 ELSE 1 END,
+                     CASE WHEN ix.UNIQUENESS = 'UNIQUE' THEN 0 ELSE 1 END
+        """
+    
+    def get_index_query(self, table_name):
+        return f"""
+            SELECT ix.INDEX_NAME,
+                   CASE WHEN con.CONSTRAINT_TYPE = 'P' THEN 1 ELSE 0 END,
+                   CASE WHEN ix.UNIQUENESS = 'UNIQUE' THEN 1 ELSE 0 END,
+                   ic.COLUMN_NAME
+            FROM ALL_INDEXES ix
+            JOIN ALL_IND_COLUMNS ic ON ic.INDEX_OWNER = ix.OWNER AND ic.INDEX_NAME = ix.INDEX_NAME
+            LEFT JOIN ALL_CONSTRAINTS con
+                ON con.OWNER = ix.TABLE_OWNER AND con.INDEX_NAME = ix.INDEX_NAME AND con.CONSTRAINT_TYPE = 'P'
+            WHERE ix.TABLE_NAME = '{table_name.upper()}' AND ix.INDEX_TYPE = 'NORMAL'
+            ORDER BY ix.INDEX_NAME, ic.COLUMN_POSITION
+        """
+    
+    def get_foreign_key_query(self, table_name):
+        return f"""
+            SELECT c.CONSTRAINT_NAME, cc.COLUMN_NAME, rc.TABLE_NAME, rcc.COLUMN_NAME
+            FROM ALL_CONSTRAINTS c
+            JOIN ALL_CONS_COLUMNS cc ON cc.OWNER = c.OWNER AND cc.CONSTRAINT_NAME = c.CONSTRAINT_NAME
+            JOIN ALL_CONSTRAINTS rc ON rc.OWNER = c.R_OWNER AND rc.CONSTRAINT_NAME = c.R_CONSTRAINT_NAME
+            JOIN ALL_CONS_COLUMNS rcc
+                ON rcc.OWNER = rc.OWNER AND rcc.CONSTRAINT_NAME = rc.CONSTRAINT_NAME AND rcc.POSITION = cc.POSITION
+            WHERE c.TABLE_NAME = '{table_name.upper()}' AND c.CONSTRAINT_TYPE = 'R'
+            ORDER BY c.CONSTRAINT_NAME, cc.POSITION
+        """
+    
+    def checksum_text(self, column, kind):
+        if kind == 'date':
+            return f"TO_CHAR({column}, 'YYYY-MM-DD HH24:MI:SS')"
+        if kind == 'text':
+            return column
+        return f"TO_CHAR({column})"
+    
+    def checksum_concat(self, parts):
+        return " || '|' || ".join(parts)
+    
+    def checksum_sum(self, row_text):
+        # 拼接结果受 VARCHAR2 长度限制（默认 4000 字节）
+        return f"SUM(TO_NUMBER(SUBSTR(RAWTOHEX(STANDARD_HASH({row_text}, 'MD5')), 1, 8), 'XXXXXXXX'))"
+    
     def get_all_tables(self):
         self.cursor.execute(f"""
             SELECT TABLE_NAME 
@@ -206,126 +1488,2812 @@ class OracleAdapter(DatabaseAdapter):
                 TABLE_TYPE = 'TABLE'
         """)
         return [row[0].lower() for row in self.cursor.fetchall()]
+    
+    def create_stream_cursor(self, batch_size):
+        cursor = self.conn.cursor()
+        cursor.arraysize = batch_size
+        cursor.prefetchrows = batch_size + 1
+        return cursor
+    
+    # ORA-00060 死锁、ORA-00051 资源等待超时、ORA-03113/03114/03135 连接中断、ORA-125xx 监听/网络错误
+    TRANSIENT_ORA_CODES = {60, 51, 3113, 3114, 3135, 12170, 12528, 12537, 12541, 12543, 12547, 12571}
+    
+    def is_transient_error(self, error):
+        if not isinstance(error, cx_Oracle.Error) or not error.args:
+            return False
+        return getattr(error.args[0], 'code', None) in self.TRANSIENT_ORA_CODES
+    
+    def build_create_table_sql(self, table_name, column_defs):
+        nologging = ' NOLOGGING' if self.fast_load else ''
+        return f"DROP TABLE IF EXISTS {table_name}; CREATE TABLE {table_name} ({', '.join(column_defs)}){nologging}"
+    
+    def finish_fast_load(self, table_name):
+        if self.fast_load:
+            self.cursor.execute(f"ALTER TABLE {table_name} LOGGING")
+    
+    def commits_each_batch(self):
+        return self.fast_load
+    
+    def build_insert_sql(self, table_name, columns):
+        # 快速加载：APPEND_VALUES 直接路径插入，配合 NOLOGGING 表几乎不产生 redo
+        hint = '/*+ APPEND_VALUES */ ' if self.fast_load else ''
+        return f"INSERT {hint}INTO {table_name} ({', '.join(columns)}) VALUES ({self.get_placeholders(len(columns))})"
+    
+    def get_input_sizes(self, column_types):
+        sizes = []
+        for col_type in column_types:
+            base, length = split_column_type(col_type)
+            if base in ('VARCHAR2', 'VARCHAR', 'NVARCHAR2', 'CHAR') and length:
+                sizes.append(length)
+            elif base == 'NUMBER':
+                sizes.append(cx_Oracle.NUMBER)
+            elif base in ('DATE', 'TIMESTAMP'):
+                sizes.append(cx_Oracle.DATETIME)
+            elif base == 'CLOB':
+                sizes.append(cx_Oracle.CLOB)
+            elif base == 'BLOB':
+                sizes.append(cx_Oracle.BLOB)
+            else:
+                sizes.append(None)
+        return sizes
+    
+    def bulk_insert(self, table_name, columns, rows, column_types=None):
+        # 数组 DML：一次往返写入整批，batcherrors 收集单行错误而不是整体中断
+        if column_types:
+            self.cursor.setinputsizes(*self.get_input_sizes(column_types))
+        self.cursor.executemany(self.build_insert_sql(table_name, columns), rows, batcherrors=True)
+        errors = self.cursor.getbatcherrors()
+        if errors:
+            for error in errors[:10]:
+                logging.error(f"Oracle 批量写入错误: {table_name} 第 {error.offset} 行 {error.message}")
+            raise Exception(f"{table_name} 批量写入有 {len(errors)} 行失败")
+        if self.fast_load:
+            # 直接路径插入后同一事务内不能再访问该表（ORA-12838），每批提交
+            self.conn.commit()
+    
+    def upsert_rows(self, table_name, columns, rows, key_columns, column_types=None):
+        source_select = "SELECT " + ', '.join(f":{i+1} AS {c}" for i, c in enumerate(columns)) + " FROM dual"
+        if column_types:
+            self.cursor.setinputsizes(*self.get_input_sizes(column_types))
+        self.cursor.executemany(self.build_merge_sql(table_name, columns, key_columns, source_select), rows)
+
+ADAPTER_CLASSES = {
+    'sqlserver': SQLServerAdapter,
+    'postgres': PostgreSQLAdapter,
+    'mysql': MySQLAdapter,
+    'oracle': OracleAdapter
+}
 
 def get_adapter(db_type):
-    adapters = {
-        'sqlserver': SQLServerAdapter(),
-        'postgres': PostgreSQLAdapter(),
-        'mysql': MySQLAdapter(),
-        'oracle': OracleAdapter()
-    }
-    return adapters[db_type]
+    return ADAPTER_CLASSES[db_type]()
 
 def load_config(config_file='config-v1.0.yaml'):
     with open(config_file, 'r', encoding='utf-8') as f:
         return yaml.safe_load(f)
 
-def migrate_table(source_adapter, target_adapter, table_name, text_widget, progress, total_rows):
-    try:
-        # 获取表结构
-        source_adapter.cursor.execute(source_adapter.get_columns_query(table_name))
-        columns = source_adapter.cursor.fetchall()
+def get_table_names(config):
+    # tables 中每项可以是表名，也可以是 {name, watermark, key} 字典
+    return [(t['name'] if isinstance(t, dict) else t).lower() for t in config.get('tables') or []]
 
-        # 创建目标表
-        create_sql = f"DROP TABLE IF EXISTS {table_name}; CREATE TABLE {table_name} ("
-        for col in columns:
-            name, sql_type, max_length = col[:3]
-            pg_type = target_adapter.map_type(sql_type, max_length)
-            create_sql += f"{name} {pg_type}, "
-        create_sql = create_sql.rstrip(', ') + ")"
-        log_info(f"执行建表SQL: {create_sql}", text_widget)
-        target_adapter.cursor.execute(create_sql)
-        
-        # 验证表创建
-        target_adapter.cursor.execute(f"SELECT * FROM {table_name} WHERE 1=0")
-        
-        # 数据迁移
-        source_adapter.cursor.execute(f"SELECT * FROM {table_name}")
-        rows = source_adapter.cursor.fetchall()
-        columns_names = [desc[0] for desc in source_adapter.cursor.description]
-        placeholders = target_adapter.get_placeholders(len(columns_names))
-        insert_sql = f"INSERT INTO {table_name} ({', '.join(columns_names)}) VALUES ({placeholders})"
-        log_info(f"执行插入SQL: {insert_sql}", text_widget)
+def get_table_options(config, table_name):
+    for item in (config or {}).get('tables') or []:
+        if isinstance(item, dict) and item['name'].lower() == table_name:
+            return item
+    return {}
+
+def configure_target(target_adapter, config):
+    # 目标适配器的写入设置：COPY 格式、快速加载配置
+    if isinstance(target_adapter, PostgreSQLAdapter):
+        target_adapter.copy_format = config.get('copy_format', 'text')
+    target_adapter.fast_load = bool(config.get('fast_load'))
+
+def connect_target(config):
+    target_adapter = get_adapter(config['target']['type'])
+    configure_target(target_adapter, config)
+    target_adapter.connect_config = config['target']['config']
+    target_adapter.connect(config['target']['config'])
+    target_adapter.begin_fast_load_session()
+    return target_adapter
+
+def connect_source(config):
+    source_adapter = get_adapter(config['source']['type'])
+    source_adapter.connect_config = config['source']['config']
+    source_adapter.connect(config['source']['config'])
+    return source_adapter
+
+# 连接池：借出时对空闲超过 health_check_interval 秒的连接做健康检查，失败则重连；
+# 归还时回滚未提交的事务，回滚失败的连接直接丢弃。max_size 为 0 表示不限制
+class ConnectionPool:
+    def __init__(self, connect, min_size=0, max_size=0, timeout=30, health_check_interval=30):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.condition = threading.Condition()
+        self.idle = []  # [(适配器, 归还时间)]
+        self.size = 0  # 已建立的连接数（含借出的）
+        for _ in range(min_size):
+            self.size += 1
+            self.idle.append((self._new_connection(), time.monotonic()))
+    
+    def _new_connection(self):
+        # 调用前已在 size 中占好名额，连接失败时释放
+        try:
+            return self.connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+    
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            while not self.idle and self.max_size and self.size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise Exception(f"连接池已满（{self.max_size} 个连接），等待 {self.timeout} 秒后仍无空闲连接")
+                self.condition.wait(remaining)
+            idle = self.idle.pop() if self.idle else None
+            if idle is None:
+                self.size += 1
+        if idle is None:
+            return self._new_connection()
+        adapter, released_at = idle
+        if time.monotonic() - released_at < self.health_check_interval:
+            return adapter
+        try:
+            adapter.ping()
+            return adapter
+        except Exception as e:
+            log_info(f"连接健康检查失败，重新连接: {str(e)}")
+            self._discard(adapter)
+            return self.acquire()
+    
+    def release(self, adapter):
+        try:
+            adapter.rollback()
+        except Exception:
+            self._discard(adapter)
+            return
+        with self.condition:
+            self.idle.append((adapter, time.monotonic()))
+            self.condition.notify()
+    
+    def _discard(self, adapter):
+        try:
+            adapter.disconnect()
+        except Exception:
+            pass
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+    
+    def close(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for adapter, _ in idle:
+            self._discard(adapter)
+
+# 本次迁移的源/目标连接池（run_migration 期间有效）；未创建连接池时借出即新建、归还即断开
+pools = {}
+
+def open_pools(config, roles=('source', 'target')):
+    # 导出/导入只连接一端，只为该端创建连接池
+    options = {
+        'min_size': config.get('pool_min_size', 0),
+        'max_size': config.get('pool_max_size', 0),
+        'timeout': config.get('pool_timeout', 30),
+        'health_check_interval': config.get('pool_health_check_interval', 30),
+    }
+    if 'source' in roles:
+        pools['source'] = ConnectionPool(lambda: connect_source(config), **options)
+    if 'target' in roles:
+        pools['target'] = ConnectionPool(lambda: connect_target(config), **options)
+
+def close_pools():
+    for pool in pools.values():
+        pool.close()
+    pools.clear()
+
+def acquire_adapter(config, role):
+    pool = pools.get(role)
+    if pool is not None:
+        return pool.acquire()
+    return connect_source(config) if role == 'source' else connect_target(config)
+
+def release_adapter(adapter, role):
+    pool = pools.get(role)
+    if pool is not None:
+        pool.release(adapter)
+    else:
+        adapter.disconnect()
+
+def connect_adapters(config):
+    # 借出一对源/目标适配器（每个工作线程/范围独占一对），用完后以 release_adapters 归还
+    source_adapter = acquire_adapter(config, 'source')
+    try:
+        target_adapter = acquire_adapter(config, 'target')
+    except Exception:
+        release_adapter(source_adapter, 'source')
+        raise
+    return source_adapter, target_adapter
+
+def release_adapters(source_adapter, target_adapter):
+    release_adapter(source_adapter, 'source')
+    release_adapter(target_adapter, 'target')
+
+# 进度汇总（多线程安全）：整体进度 0~100，每张表占 100/表数，变化时通过 'progress' 事件通知订阅者
+class MigrationProgress:
+    def __init__(self, total_tables):
+        self.table_weight = 100 / total_tables if total_tables else 0
+        self.lock = threading.Lock()
+        self.percent = 0.0
+        self.reported = {}  # 表名 -> 已上报的完成比例
+        self.migrated = {}  # 表名 -> 已写入行数（同一张表可能由多个范围线程并发写入）
+    
+    def advance(self, table_name, batch_rows, total_rows):
+        with self.lock:
+            migrated = self.migrated.get(table_name, 0) + batch_rows
+            self.migrated[table_name] = migrated
+        fraction = min(migrated / total_rows, 1.0) if total_rows else 1.0
+        self._report(table_name, fraction)
+    
+    def finish(self, table_name):
+        self._report(table_name, 1.0)
+    
+    def restart(self, table_name):
+        # 表级重试时重新计数已写入行数，已上报的进度保持不变（不回退进度条）
+        with self.lock:
+            self.migrated[table_name] = 0
+    
+    def _report(self, table_name, fraction):
+        with self.lock:
+            step_value = (fraction - self.reported.get(table_name, 0.0)) * self.table_weight
+            if step_value <= 0:
+                return
+            self.reported[table_name] = fraction
+            self.percent = min(self.percent + step_value, 100.0)
+            percent = self.percent
+        notify('progress', percent=percent)
+
+def latency_quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+# 迁移各阶段的结构化指标：按批/按表以 JSON 行写入 metrics_file，可选在本地 metrics_port 提供 Prometheus 文本格式；
+# 阶段耗时为各线程累计值，fetch 与 convert+write+commit 对比可判断瓶颈在源库还是目标库
+class MigrationMetrics:
+    STAGES = ('fetch', 'convert', 'write', 'commit')
+    QUANTILES = (0.5, 0.95, 0.99)
+    
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.output = None
+        self.server = None
+    
+    def start(self, config):
+        metrics_file = config.get('metrics_file')
+        port = config.get('metrics_port', 0)
+        self.tables = {}
+        if metrics_file:
+            self.output = open(metrics_file, 'a', encoding='utf-8')
+        if port:
+            self.server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsHandler)
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.enabled = bool(metrics_file or port)
+    
+    def stop(self):
+        self.enabled = False
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        with self.lock:
+            if self.output is not None:
+                self.output.close()
+                self.output = None
+    
+    def _new_stats(self):
+        return {
+            'rows': 0, 'bytes': 0, 'batches': 0, 'started': time.time(), 'seconds': None,
+            'stages': dict.fromkeys(self.STAGES, 0.0), 'latencies': [],
+            'queue_depth': 0, 'queue_depth_max': 0, 'batch_size': None, 'batch_resizes': 0,
+        }
+    
+    def start_table(self, table_name):
+        with self.lock:
+            self.tables[table_name] = self._new_stats()
+    
+    def record_batch(self, table_name, seq, rows, nbytes, stages, queue_depth=None):
+        latency = sum(seconds for stage, seconds in stages.items() if stage != 'fetch')
+        with self.lock:
+            stats = self.tables.get(table_name)
+            if stats is None:
+                stats = self.tables[table_name] = self._new_stats()
+            stats['rows'] += rows
+            stats['bytes'] += nbytes
+            stats['batches'] += 1
+            for stage, seconds in stages.items():
+                stats['stages'][stage] += seconds
+            stats['latencies'].append(latency)
+            if queue_depth is not None:
+                stats['queue_depth'] = queue_depth
+                stats['queue_depth_max'] = max(stats['queue_depth_max'], queue_depth)
+        event = {'event': 'batch', 'table': table_name, 'seq': seq, 'rows': rows, 'bytes': nbytes,
+                 'latency_s': round(latency, 6)}
+        event.update({f'{stage}_s': round(seconds, 6) for stage, seconds in stages.items()})
+        if queue_depth is not None:
+            event['queue_depth'] = queue_depth
+        self._emit(event)
+    
+    def record_batch_size(self, table_name, rows, previous=None, seconds=None):
+        # 自适应批大小的初始值（previous 为 None）和每次调整
+        with self.lock:
+            stats = self.tables.get(table_name)
+            if stats is None:
+                stats = self.tables[table_name] = self._new_stats()
+            stats['batch_size'] = rows
+            if previous is not None:
+                stats['batch_resizes'] += 1
+        event = {'event': 'batch_size', 'table': table_name, 'rows': rows, 'previous': previous}
+        if seconds is not None:
+            event['write_s'] = round(seconds, 6)
+        self._emit(event)
+    
+    def record_stage(self, table_name, stage, seconds):
+        with self.lock:
+            stats = self.tables.get(table_name)
+            if stats is not None:
+                stats['stages'][stage] += seconds
+    
+    def finish_table(self, table_name):
+        with self.lock:
+            stats = self.tables.get(table_name)
+            if stats is None:
+                return
+            stats['seconds'] = time.time() - stats['started']
+            event = self._summary(table_name, stats)
+        self._emit(event)
+    
+    def _summary(self, table_name, stats):
+        seconds = stats['seconds'] if stats['seconds'] is not None else time.time() - stats['started']
+        latencies = sorted(stats['latencies'])
+        stages = stats['stages']
+        target_seconds = stages['convert'] + stages['write'] + stages['commit']
+        summary = {
+            'event': 'table', 'table': table_name, 'rows': stats['rows'], 'bytes': stats['bytes'],
+            'batches': stats['batches'], 'seconds': round(seconds, 3),
+            'rows_per_s': round(stats['rows'] / seconds, 1) if seconds else 0.0,
+            'bytes_per_s': round(stats['bytes'] / seconds, 1) if seconds else 0.0,
+            'queue_depth_max': stats['queue_depth_max'],
+            'batch_size': stats['batch_size'], 'batch_resizes': stats['batch_resizes'],
+            'bound': 'source' if stages['fetch'] > target_seconds else 'target',
+        }
+        summary.update({f'{stage}_s': round(value, 3) for stage, value in stages.items()})
+        summary.update({f'latency_p{int(q * 100)}_s': round(latency_quantile(latencies, q), 6)
+                        for q in self.QUANTILES})
+        return summary
+    
+    def _emit(self, event):
+        if self.output is None:
+            return
+        event['ts'] = round(time.time(), 3)
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self.lock:
+            if self.output is not None:
+                self.output.write(line + '\n')
+                self.output.flush()
+    
+    def render_prometheus(self):
+        lines = [
+            '# TYPE sync_table_rows_total counter',
+            '# TYPE sync_table_bytes_total counter',
+            '# TYPE sync_table_batches_total counter',
+            '# TYPE sync_table_stage_seconds_total counter',
+            '# TYPE sync_table_batch_latency_seconds summary',
+            '# TYPE sync_table_queue_depth gauge',
+            '# TYPE sync_table_batch_size_rows gauge',
+            '# TYPE sync_table_batch_resizes_total counter',
+        ]
+        with self.lock:
+            for table_name, stats in self.tables.items():
+                label = f'table="{table_name}"'
+                lines.append(f'sync_table_rows_total{{{label}}} {stats["rows"]}')
+                lines.append(f'sync_table_bytes_total{{{label}}} {stats["bytes"]}')
+                lines.append(f'sync_table_batches_total{{{label}}} {stats["batches"]}')
+                for stage, seconds in stats['stages'].items():
+                    lines.append(f'sync_table_stage_seconds_total{{{label},stage="{stage}"}} {seconds:.6f}')
+                latencies = sorted(stats['latencies'])
+                for q in self.QUANTILES:
+                    lines.append(f'sync_table_batch_latency_seconds{{{label},quantile="{q}"}} '
+                                 f'{latency_quantile(latencies, q):.6f}')
+                lines.append(f'sync_table_batch_latency_seconds_sum{{{label}}} {sum(latencies):.6f}')
+                lines.append(f'sync_table_batch_latency_seconds_count{{{label}}} {len(latencies)}')
+                lines.append(f'sync_table_queue_depth{{{label}}} {stats["queue_depth"]}')
+                if stats['batch_size'] is not None:
+                    lines.append(f'sync_table_batch_size_rows{{{label}}} {stats["batch_size"]}')
+                    lines.append(f'sync_table_batch_resizes_total{{{label}}} {stats["batch_resizes"]}')
+        return '\n'.join(lines) + '\n'
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+# 全局指标（未配置 metrics_file/metrics_port 时不采集）
+metrics = MigrationMetrics()
+
+# 检查点键值编码：JSON 不支持 Decimal/日期，按类型打标签保存
+def encode_checkpoint_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return ['datetime', value.isoformat()]
+    if isinstance(value, datetime.date):
+        return ['date', value.isoformat()]
+    if isinstance(value, decimal.Decimal):
+        return ['decimal', str(value)]
+    if isinstance(value, float):
+        return ['float', repr(value)]
+    if isinstance(value, (bytes, bytearray)):
+        return ['bytes', bytes(value).hex()]
+    if isinstance(value, str):
+        return ['str', value]
+    return ['int', str(value)]
+
+def decode_checkpoint_value(encoded):
+    if encoded is None:
+        return None
+    kind, text = encoded
+    return {
+        'datetime': datetime.datetime.fromisoformat,
+        'date': datetime.date.fromisoformat,
+        'decimal': decimal.Decimal,
+        'float': float,
+        'bytes': bytes.fromhex,
+        'str': str,
+        'int': int,
+    }[kind](text)
+
+# 断点续传记录：JSON 文件，记录每张表的状态、范围划分以及每个范围最后提交的键值
+class CheckpointStore:
+    def __init__(self, path, save_interval=1.0):
+        self.path = path
+        self.save_interval = save_interval  # 两次落盘的最小间隔（秒），完成类事件总是立即落盘
+        self.lock = threading.Lock()
+        self.last_save = 0.0
+        self.data = {'tables': {}}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+    
+    def get_table(self, table_name):
+        with self.lock:
+            return self.data['tables'].get(table_name)
+    
+    def is_done(self, table_name):
+        state = self.get_table(table_name)
+        return state is not None and state['status'] == 'done'
+    
+    def start_table(self, table_name, split_column, key_ranges):
+        with self.lock:
+            self.data['tables'][table_name] = {
+                'status': 'running',
+                'split_column': split_column,
+                'ranges': [
+                    None if r is None else [encode_checkpoint_value(r[0]), encode_checkpoint_value(r[1]), r[2]]
+                    for r in key_ranges or []
+                ],
+                'range_state': {},
+            }
+            self._save(force=True)
+    
+    def get_ranges(self, table_name):
+        state = self.get_table(table_name)
+        return [
+            None if r is None else (decode_checkpoint_value(r[0]), decode_checkpoint_value(r[1]), r[2])
+            for r in state['ranges']
+        ]
+    
+    def get_range_state(self, table_name, range_id):
+        with self.lock:
+            return dict(self.data['tables'][table_name]['range_state'].get(str(range_id), {}))
+    
+    def save_key(self, table_name, range_id, last_key, rows):
+        with self.lock:
+            range_state = self.data['tables'][table_name]['range_state'].setdefault(str(range_id), {})
+            range_state.update(status='running', last_key=encode_checkpoint_value(last_key), rows=rows)
+            self._save()
+    
+    def finish_range(self, table_name, range_id, rows):
+        with self.lock:
+            range_state = self.data['tables'][table_name]['range_state'].setdefault(str(range_id), {})
+            range_state.update(status='done', rows=rows)
+            self._save(force=True)
+    
+    def finish_table(self, table_name):
+        with self.lock:
+            self.data['tables'].setdefault(table_name, {})['status'] = 'done'
+            self._save(force=True)
+    
+    def clear(self):
+        with self.lock:
+            self.data = {'tables': {}}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+    
+    def _save(self, force=False):
+        now = time.time()
+        if not force and now - self.last_save < self.save_interval:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.last_save = now
+
+# 增量同步高水位：JSON 文件，跨运行保留（与检查点不同，迁移成功后不清除）
+class WatermarkStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+    
+    def get(self, table_name, column):
+        # 水位列配置变更后旧水位作废，重新全量
+        with self.lock:
+            entry = self.data.get(table_name)
+        if not entry or entry['column'].lower() != column.lower():
+            return None
+        return decode_checkpoint_value(entry['value'])
+    
+    def set(self, table_name, column, value):
+        with self.lock:
+            self.data[table_name] = {'column': column, 'value': encode_checkpoint_value(value)}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+# 每条目录查询包含的表数（Oracle 的 IN 列表最多 1000 项）
+SCHEMA_QUERY_CHUNK = 500
+
+# 源表列定义缓存：迁移开始前按批一次查询所有待迁移表的列，各工作线程共用，不再逐表查询目录；
+# 配置 schema_cache_file 时落盘，下次运行源库结构指纹不变则直接复用
+class SchemaCache:
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.tables = {}  # 小写表名 -> [(列名, 类型, 长度), ...]，已查询但不存在的表不在其中
+        self.loaded = set()  # 已批量查询过的小写表名
+        self.saved = None
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.saved = json.load(f)
+    
+    def load(self, adapter, table_names):
+        fingerprint = None
+        fingerprint_query = adapter.get_schema_fingerprint_query()
+        if self.path and fingerprint_query:
+            adapter.cursor.execute(fingerprint_query)
+            fingerprint = f"{type(adapter).__name__}:{tuple(adapter.cursor.fetchone())!r}"
+        if self.saved and fingerprint is not None and self.saved.get('fingerprint') == fingerprint:
+            with self.lock:
+                self.tables = {name: [tuple(col) for col in cols] for name, cols in self.saved['tables'].items()}
+                self.loaded = set(self.saved['loaded'])
         
-        # 批量插入
-        batch_size = 1000
-        for i in range(0, len(rows), batch_size):
-            target_adapter.cursor.executemany(insert_sql, rows[i:i+batch_size])
-            step_value = (i + batch_size)/total_rows * 100
-            root.after(0, progress.step, step_value)
-            root.update_idletasks()
+        missing = [name for name in dict.fromkeys(table_names) if name.lower() not in self.loaded]
+        if not missing or adapter.get_all_columns_query(missing[:1]) is None:
+            return
+        for i in range(0, len(missing), SCHEMA_QUERY_CHUNK):
+            chunk = missing[i:i + SCHEMA_QUERY_CHUNK]
+            adapter.cursor.execute(adapter.get_all_columns_query(chunk))
+            rows = adapter.cursor.fetchall()
+            with self.lock:
+                for table_name, column_name, data_type, max_length in rows:
+                    self.tables.setdefault(table_name.lower(), []).append((column_name, data_type, max_length))
+                self.loaded.update(name.lower() for name in chunk)
+        log_info(f"已加载 {len(missing)} 张表的列定义")
+        if fingerprint is not None:
+            self._save(fingerprint)
+    
+    def exists(self, adapter, table_name):
+        with self.lock:
+            if table_name.lower() in self.loaded:
+                return table_name.lower() in self.tables
+        return adapter.table_exists(table_name)
+    
+    def get_columns(self, adapter, table_name):
+        with self.lock:
+            if table_name.lower() in self.loaded:
+                return self.tables.get(table_name.lower(), [])
+        adapter.cursor.execute(adapter.get_columns_query(table_name))
+        return adapter.cursor.fetchall()
+    
+    def _save(self, fingerprint):
+        with self.lock:
+            data = {'fingerprint': fingerprint, 'loaded': sorted(self.loaded), 'tables': self.tables}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+
+# 单个范围的检查点推进：批次按读取顺序编号，只有连续完成的批次才推进最后键值
+# （多个写线程时批次可能乱序完成）
+class RangeCheckpointer:
+    def __init__(self, store, table_name, range_id, split_column, rows_done=0):
+        self.store = store
+        self.table_name = table_name
+        self.range_id = range_id
+        self.split_column = split_column
+        self.key_index = None
+        self.rows = rows_done
+        self.next_seq = 0
+        self.completed = {}
+        self.lock = threading.Lock()
+    
+    def bind(self, columns_names):
+        lowered = [c.lower() for c in columns_names]
+        self.key_index = lowered.index(self.split_column.lower())
+    
+    def batch_done(self, seq, last_row, count):
+        with self.lock:
+            self.completed[seq] = (last_row[self.key_index], count)
+            last_key = None
+            while self.next_seq in self.completed:
+                last_key, count = self.completed.pop(self.next_seq)
+                self.rows += count
+                self.next_seq += 1
+            if last_key is not None:
+                self.store.save_key(self.table_name, self.range_id, last_key, self.rows)
+    
+    def finish(self):
+        self.store.finish_range(self.table_name, self.range_id, self.rows)
+
+def estimate_batch_bytes(batch):
+    # 粗略估算一批数据的写入量：字符串/二进制按长度，其余值按 8 字节；列式批次直接取缓冲区大小
+    if pa is not None and isinstance(batch, pa.RecordBatch):
+        return batch.nbytes
+    size = 0
+    for row in batch:
+        for value in row:
+            size += len(value) if isinstance(value, (str, bytes, bytearray)) else 8
+    return size
+
+def estimate_row_bytes(columns):
+    # 由列定义 (列名, 类型, 长度) 估算行宽，作为自适应批大小的初始值，之后按实测行宽修正
+    size = 0
+    for col in columns:
+        base = str(col[1]).split('(')[0].strip().lower()
+        try:
+            max_length = int(col[2] or 0)
+        except (TypeError, ValueError):
+            max_length = 0
+        if base in ROW_WIDTH_LOB_TYPES or max_length < 0:
+            size += ROW_WIDTH_LOB_BYTES
+        else:
+            size += min(max(max_length, 8), ROW_WIDTH_LOB_BYTES)
+    return max(size, 8)
+
+# 自适应批大小（每张表一个，并行范围和流水线写线程共享）：每批行数 = 字节预算 / 行宽。
+# 单批写入耗时不超过 batch_target_seconds 时每批加性增大 step 行，超过时减半（AIMD）；
+# 行宽按实测值滑动平均修正，单批估算字节数不超过 batch_max_bytes 除以同时在内存中的批数
+class BatchSizer:
+    def __init__(self, table_name, row_bytes, config):
+        self.table_name = table_name
+        self.target_seconds = config.get('batch_target_seconds', DEFAULT_BATCH_TARGET_SECONDS)
+        # 流水线模式下队列中缓存的批次、各写线程手中的批次和正在读取的批次同时占用内存
+        in_flight = 1
+        if config.get('pipeline'):
+            in_flight = config.get('pipeline_depth', 4) + max(config.get('pipeline_writers', 1), 1) + 1
+        self.max_bytes = config.get('batch_max_bytes', DEFAULT_BATCH_MAX_BYTES) / in_flight
+        self.row_bytes = float(row_bytes)
+        self.lock = threading.Lock()
+        # 从字节预算的 1/4 起步，之后每批最多增加同样的行数
+        self.rows = self._clamp(self.max_bytes / 4 / self.row_bytes)
+        self.step = self.rows
+        self.min_rows = self.max_rows = self.rows
+        log_info(f"自适应批大小: {table_name} 估算行宽 {row_bytes} 字节，初始 {self.rows} 行/批")
+        if metrics.enabled:
+            metrics.record_batch_size(table_name, self.rows)
+    
+    def _clamp(self, rows):
+        limit = max(int(self.max_bytes / self.row_bytes), BATCH_MIN_ROWS)
+        return int(min(max(rows, BATCH_MIN_ROWS), limit, BATCH_MAX_ROWS))
+    
+    def observe(self, batch, seconds, nbytes=0):
+        # 每批写入后调用：seconds 为该批写入本身的耗时（不含重试等待和重放），nbytes 为调用方已估算的整批字节数（为 0 时抽样估算行宽）
+        rows = len(batch)
+        if not rows:
+            return
+        if nbytes:
+            row_bytes = nbytes / rows
+        else:
+            sample = batch[::max(rows // BATCH_SAMPLE_ROWS, 1)]
+            row_bytes = estimate_batch_bytes(sample) / len(sample)
+        with self.lock:
+            self.row_bytes = 0.8 * self.row_bytes + 0.2 * max(row_bytes, 1.0)
+            previous = self.rows
+            if seconds > self.target_seconds:
+                self.rows = self._clamp(self.rows // 2)
+            else:
+                self.rows = self._clamp(self.rows + self.step)
+            self.min_rows = min(self.min_rows, self.rows)
+            self.max_rows = max(self.max_rows, self.rows)
+            if self.rows != previous:
+                logging.info(f"自适应批大小: {self.table_name} {previous} -> {self.rows} 行/批"
+                             f"（上一批 {rows} 行 {seconds:.3f} 秒，行宽约 {self.row_bytes:.0f} 字节）")
+                if metrics.enabled:
+                    metrics.record_batch_size(self.table_name, self.rows, previous, seconds)
+    
+    def summary(self):
+        return (f"自适应批大小: {self.table_name} 最终 {self.rows} 行/批（约 {self.rows * self.row_bytes / 1024:.0f} KB，"
+                f"行宽约 {self.row_bytes:.0f} 字节），调整范围 {self.min_rows}~{self.max_rows} 行")
+
+def arrow_column_type(source_type):
+    # 按源列类型确定 Arrow 列类型，同一列的所有批次（和所有分块文件）类型一致，不随某批的取值变化；
+    # 定点小数（位数不定）和未知类型按字符串保存，与 PostgreSQL COPY 读取时的处理一致
+    if not source_type:
+        return pa.string()
+    text = str(source_type).lower()
+    base = text.split('(')[0].strip()
+    # MySQL 无符号整数（bigint unsigned 可超出 int64）
+    unsigned = 'unsigned' in text
+    kind = classify_checksum_type(text.replace('unsigned', '').replace('zerofill', ''))
+    if kind == 'number':
+        return pa.uint64() if unsigned else pa.int64()
+    if kind == 'bool':
+        return pa.bool_()
+    if kind == 'date':
+        if 'time zone' in text:
+            return pa.string()
+        # Oracle 的 DATE（大写）带时分秒
+        return pa.date32() if base == 'date' and str(source_type) != 'DATE' else pa.timestamp('us')
+    if base in STAGE_FLOAT_TYPES:
+        return pa.float64()
+    if base in STAGE_BINARY_TYPES:
+        return pa.binary()
+    return pa.string()
+
+def arrow_schema(columns_names, source_types):
+    return pa.schema([(name, arrow_column_type(source_types.get(name.lower()))) for name in columns_names])
+
+def arrow_array(values, arrow_type):
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # 驱动返回的值与列类型不一致（Decimal/UUID 存为字符串、日期读成字符串、bit 读成整数），转为文本后由 Arrow 解析
+        text = pa.array([value if value is None or isinstance(value, str) else str(value) for value in values],
+                        pa.string())
+        return text if arrow_type == pa.string() else text.cast(arrow_type)
+
+def conform_record_batch(record_batch, schema):
+    # 把驱动直接产出的列式批次转为统一的 schema；时间戳降到微秒时截断（datetime2 的 100 纳秒位）
+    if record_batch.schema.equals(schema):
+        return record_batch
+    arrays = []
+    for column, field in zip(record_batch.columns, schema):
+        if column.type != field.type:
+            column = column.cast(field.type, safe=not pa.types.is_timestamp(field.type))
+        arrays.append(column)
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def parquet_schema(record_batch):
+    # 没有源列类型时 Parquet 文件的列类型取自第一批；该批中全 NULL 的列按字符串列写入
+    return pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                      for field in record_batch.schema])
+
+def spill_to_parquet(record_batches, path, batch_size=DEFAULT_BATCH_SIZE, schema=None):
+    # 先把源端批次全部落盘为 Parquet 再读回写入，尽早结束源端长查询
+    writer = None
+    try:
+        try:
+            for record_batch in record_batches:
+                if writer is None:
+                    schema = schema or parquet_schema(record_batch)
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_batch(conform_record_batch(record_batch, schema))
+        finally:
+            record_batches.close()
+            if writer is not None:
+                writer.close()
+        if writer is not None:
+            yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+def converting_writer(target_adapter, write, convert):
+    # 写入前整批做类型转换，耗时计入目标适配器的 convert 阶段；重放时重新转换原始批次
+    if convert is None:
+        return write
+    def convert_and_write(batch):
+        start = time.perf_counter()
+        rows = convert(batch)
+        target_adapter.convert_seconds += time.perf_counter() - start
+        write(rows)
+    return convert_and_write
+
+def retry_delay(attempt, config=None):
+    # 指数退避加随机抖动，避免多个线程同时重连
+    config = config or {}
+    base = config.get('retry_backoff', DEFAULT_RETRY_BACKOFF)
+    limit = config.get('retry_backoff_max', DEFAULT_RETRY_BACKOFF_MAX)
+    return min(base * 2 ** attempt, limit) * random.uniform(0.5, 1.0)
+
+def wait_for_retry(delay):
+    # 分段等待，等待期间用户取消时立即退出
+    deadline = time.monotonic() + delay
+    while time.monotonic() < deadline:
+        if not is_running:
+            raise Exception("迁移被用户取消")
+        time.sleep(min(0.5, deadline - time.monotonic()))
+
+# 目标连接的提交策略：未提交的行数达到 commit_rows 或估算字节数达到 commit_bytes 时提交，
+# 检查点只在提交后推进；某批写入失败时回滚该连接上尚未提交的批次。
+# 写入遇到瞬时错误时重连目标库，重放本事务中未提交的批次和失败的批次（回滚后这些行都不在目标表中，重放是幂等的）；
+# 提交本身失败时结果未知，不在此重放，交给表级重试按检查点或重建表处理
+class CommitPolicy:
+    def __init__(self, target_adapter, table_name, config=None, checkpointer=None, sizer=None):
+        config = config or {}
+        self.target_adapter = target_adapter
+        self.table_name = table_name
+        self.config = config
+        self.commit_rows = config.get('commit_rows', DEFAULT_COMMIT_ROWS)
+        self.commit_bytes = config.get('commit_bytes', 0)
+        self.retry_attempts = config.get('retry_attempts', DEFAULT_RETRY_ATTEMPTS)
+        # 未提交的批次需保留在内存中才能重放，只有按行数/字节数分段提交时才有上界
+        self.replayable = bool(self.retry_attempts and (self.commit_rows or self.commit_bytes))
+        self.checkpointer = checkpointer
+        self.sizer = sizer
+        self.pending = []  # 已写入未提交的批次: (序号, 批次（不可重放时只保留最后一行）, 行数)
+        self.rows = 0
+        self.bytes = 0
+    
+    def write_batch(self, seq, batch, write, fetch_seconds=0.0, queue_depth=None):
+        convert_before = self.target_adapter.convert_seconds
+        start = time.perf_counter()
+        batch_seconds = self._write_with_retry(batch, write)
+        write_seconds = time.perf_counter() - start
+        nbytes = estimate_batch_bytes(batch) if self.commit_bytes or metrics.enabled else 0
+        if self.sizer is not None:
+            self.sizer.observe(batch, batch_seconds, nbytes)
+        self.pending.append((seq, batch if self.replayable else batch[-1:], len(batch)))
+        self.rows += len(batch)
+        self.bytes += nbytes
+        commit_seconds = 0.0
+        # 目标每批自行提交时（Oracle 直接路径插入）同步提交，避免重试时重放已提交的批次
+        if (self.target_adapter.commits_each_batch() or
+                (self.commit_rows and self.rows >= self.commit_rows) or
+                (self.commit_bytes and self.bytes >= self.commit_bytes)):
+            commit_seconds = self.commit()
+        if metrics.enabled:
+            convert_seconds = self.target_adapter.convert_seconds - convert_before
+            stages = {'fetch': fetch_seconds, 'convert': convert_seconds,
+                      'write': write_seconds - convert_seconds, 'commit': commit_seconds}
+            metrics.record_batch(self.table_name, seq, len(batch), nbytes, stages, queue_depth)
+    
+    def _write_with_retry(self, batch, write):
+        # 返回最后一次成功写入该批本身的耗时（不含重连、重放和重试等待），供自适应批大小使用
+        attempt = 0
+        while True:
+            try:
+                if attempt:
+                    self.target_adapter.reconnect()
+                    for _, pending_batch, _ in self.pending:
+                        write(pending_batch)
+                start = time.perf_counter()
+                write(batch)
+                return time.perf_counter() - start
+            except Exception as e:
+                if (not self.replayable or attempt >= self.retry_attempts or not is_running or
+                        not self.target_adapter.is_transient_error(e)):
+                    self.rollback()
+                    raise
+                delay = retry_delay(attempt, self.config)
+                attempt += 1
+                log_info(f"{self.table_name} 写入遇到瞬时错误，{delay:.1f} 秒后重连并重放 "
+                         f"{len(self.pending) + 1} 批（第 {attempt} 次重试）: {str(e)}", "orange")
+                wait_for_retry(delay)
+    
+    def commit(self):
+        # 返回提交耗时；写批次时触发的提交计入该批次，其余（收尾提交）单独计入 commit 阶段
+        start = time.perf_counter()
+        self.target_adapter.commit()
+        seconds = time.perf_counter() - start
+        if self.checkpointer is not None:
+            for seq, rows, count in self.pending:
+                self.checkpointer.batch_done(seq, rows[-1], count)
+        self._reset()
+        return seconds
+    
+    def finish(self):
+        seconds = self.commit()
+        if metrics.enabled:
+            metrics.record_stage(self.table_name, 'commit', seconds)
+    
+    def rollback(self):
+        try:
+            self.target_adapter.rollback()
+        except Exception as e:
+            logging.error(f"回滚失败: {str(e)}")
+        self._reset()
+    
+    def _reset(self):
+        self.pending = []
+        self.rows = 0
+        self.bytes = 0
+
+def timed_batches(batches):
+    # 为每批附加序号和从源库取得该批的耗时：(序号, 批次, 读取秒数)
+    try:
+        seq = 0
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                return
+            yield seq, batch, time.perf_counter() - start
+            seq += 1
+    finally:
+        # 生成器需关闭以释放游标，普通迭代器没有 close
+        close = getattr(batches, 'close', None)
+        if close is not None:
+            close()
+
+# 流水线结束标记
+_PIPELINE_END = object()
+
+def pipeline_copy(batches, target_adapter, table_name, columns_names, column_types, progress, total_rows,
+                  config, stop_event=None, checkpointer=None, convert=None, arrow=False, sizer=None):
+    # 读写重叠：当前线程读取并放入有界队列，写线程并发取出写入；任一方失败或取消时两侧都会退出
+    depth = config.get('pipeline_depth', 4)
+    writers = max(config.get('pipeline_writers', 1), 1)
+    batch_queue = queue.Queue(maxsize=depth)
+    failed = threading.Event()
+    errors = []
+    lock = threading.Lock()
+    migrated = [0]
+    
+    def should_stop():
+        return failed.is_set() or not is_running or (stop_event is not None and stop_event.is_set())
+    
+    def put(item):
+        # 队列满时阻塞（背压），但周期性检查对方是否已失败
+        while not should_stop():
+            try:
+                batch_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def write(adapter):
+        policy = CommitPolicy(adapter, table_name, config, checkpointer, sizer)
+        insert = converting_writer(
+            adapter, lambda batch: (adapter.write_arrow if arrow else adapter.bulk_insert)(
+                table_name, columns_names, batch, column_types), convert)
+        try:
+            while True:
+                try:
+                    item = batch_queue.get(timeout=0.5)
+                except queue.Empty:
+                    if should_stop():
+                        break
+                    continue
+                if item is _PIPELINE_END or should_stop():
+                    break
+                seq, batch, fetch_seconds = item
+                policy.write_batch(seq, batch, insert, fetch_seconds, batch_queue.qsize())
+                with lock:
+                    migrated[0] += len(batch)
+                progress.advance(table_name, len(batch), total_rows)
+            # 正常结束时提交剩余批次；失败或取消时回滚，续传会从已提交的位置继续
+            if should_stop():
+                policy.rollback()
+            else:
+                policy.finish()
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+    
+    def run_writer(index):
+        # 第一个写线程复用当前目标连接，其余写线程各自建立连接
+        if index == 0:
+            return write(target_adapter)
+        try:
+            adapter = acquire_adapter(config, 'target')
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+            return
+        try:
+            write(adapter)
+        finally:
+            release_adapter(adapter, 'target')
+    
+    threads = [threading.Thread(target=run_writer, args=(i,), daemon=True) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for item in timed_batches(batches):
+            if not put(item):
+                break
+        else:
+            for _ in threads:
+                put(_PIPELINE_END)
+    except Exception as e:
+        errors.append(e)
+        failed.set()
+    finally:
+        try:
+            batches.close()
+        except Exception:
+            pass
+        for thread in threads:
+            thread.join()
+    
+    if errors:
+        raise errors[0]
+    if should_stop():
+        raise Exception("迁移被用户取消")
+    return migrated[0]
+
+def copy_table_rows(source_adapter, target_adapter, table_name, target_types, progress, total_rows,
+                    batch_size=DEFAULT_BATCH_SIZE, where=None, params=None, stop_event=None, config=None,
+                    checkpointer=None, source_types=None, sizer=None):
+    # 数据迁移（服务端游标流式读取，边读边写），返回写入行数
+    # 带检查点时按拆分列排序读取，每批提交后记录最后键值
+    # transport: arrow 时按 Arrow 列式批次传输（检查点需要逐行键值，仍走逐行传输），类型由目标端按列解析
+    query = f"SELECT * FROM {table_name}"
+    if where:
+        query += f" WHERE {where}"
+    if checkpointer is not None:
+        query += f" ORDER BY {checkpointer.split_column}"
+    arrow = bool(config and config.get('transport') == 'arrow' and checkpointer is None)
+    if arrow:
+        columns_names, batches = source_adapter.stream_arrow(query, batch_size, params, source_types)
+        if config.get('arrow_spill_dir'):
+            spill_path = os.path.join(config['arrow_spill_dir'], f"{table_name}.{uuid.uuid4().hex}.parquet")
+            schema = arrow_schema(columns_names, source_types) if source_types else None
+            batches = spill_to_parquet(batches, spill_path, batch_size, schema)
+        convert = None
+    else:
+        columns_names, batches = source_adapter.stream_rows(query, batch_size, params, sizer)
+        convert = build_row_converter(columns_names, source_types, target_types) if source_types else None
+    column_types = [target_types.get(c.lower()) or 'TEXT' for c in columns_names]
+    if checkpointer is not None:
+        checkpointer.bind(columns_names)
+    
+    if config and config.get('pipeline'):
+        return pipeline_copy(batches, target_adapter, table_name, columns_names, column_types, progress,
+                             total_rows, config, stop_event, checkpointer, convert, arrow, sizer)
+    
+    # 批量插入，按提交策略分段提交
+    policy = CommitPolicy(target_adapter, table_name, config, checkpointer, sizer)
+    write = target_adapter.write_arrow if arrow else target_adapter.bulk_insert
+    insert = converting_writer(
+        target_adapter, lambda batch: write(table_name, columns_names, batch, column_types), convert)
+    migrated = 0
+    for seq, batch, fetch_seconds in timed_batches(batches):
+        if not is_running or (stop_event is not None and stop_event.is_set()):
+            policy.rollback()
+            raise Exception("迁移被用户取消")
+        policy.write_batch(seq, batch, insert, fetch_seconds)
+        migrated += len(batch)
+        progress.advance(table_name, len(batch), total_rows)
+    policy.finish()
+    return migrated
+
+def plan_key_ranges(source_adapter, table_name, partitions):
+    # 按主键/索引列的 MIN/MAX 切分为若干范围，返回 (拆分列, [(下界, 上界, 是否含上界), ..., None])，
+    # 末尾的 None 表示拆分列为 NULL 的行；不可拆分时返回 (None, None)
+    split_column = source_adapter.get_split_column(table_name)
+    if not split_column:
+        return None, None
+    source_adapter.cursor.execute(f"SELECT MIN({split_column}), MAX({split_column}) FROM {table_name}")
+    low, high = source_adapter.cursor.fetchone()
+    if low is None or high is None or not high > low:
+        return None, None
+    # 非主键索引列可能为 NULL，单独作为一个范围保证结果与串行复制一致
+    return split_column, split_key_range(low, high, partitions) + [None]
+
+def build_range_where(adapter, split_column, key_range, last_key=None):
+    # 按适配器的参数风格生成范围条件；last_key 用于断点续传：拆分列可能是非唯一索引列，与 last_key 相同的行
+    # 可能跨越提交边界，因此从 last_key（含）继续，目标端先删除这些行再重新复制
+    if key_range is None:
+        return f"{split_column} IS NULL", None
+    low, high, inclusive = key_range
+    markers = adapter.get_placeholders(3).split(', ')
+    upper_op = '<=' if inclusive else '<'
+    if last_key is None:
+        return f"{split_column} >= {markers[0]} AND {split_column} {upper_op} {markers[1]}", (low, high)
+    return (f"{split_column} >= {markers[0]} AND {split_column} {upper_op} {markers[1]} "
+            f"AND {split_column} >= {markers[2]}", (low, high, last_key))
+
+def copy_key_range(source_adapter, target_adapter, table_name, split_column, range_id, key_range, target_types,
+                   progress, total_rows, batch_size, config, stop_event=None, checkpoints=None, source_types=None,
+                   sizer=None):
+    checkpointer = None
+    last_key = None
+    if checkpoints is not None:
+        state = checkpoints.get_range_state(table_name, range_id)
+        if state.get('status') == 'done':
+            progress.advance(table_name, state.get('rows', 0), total_rows)
+            return state.get('rows', 0)
+        rows_done = 0
+        if key_range is not None and state.get('last_key') is not None:
+            last_key = decode_checkpoint_value(state['last_key'])
+            # 键值等于 last_key 的已提交行会被删除并重新复制，不计入已完成行数
+            target_adapter.cursor.execute(
+                f"SELECT COUNT(*) FROM {table_name} WHERE {split_column} = {target_adapter.get_placeholders(1)}",
+                (last_key,))
+            rows_done = state.get('rows', 0) - target_adapter.cursor.fetchone()[0]
+            progress.advance(table_name, rows_done, total_rows)
+        # 清理目标表中该范围上次未记录到检查点的行，保证续传幂等
+        where, params = build_range_where(target_adapter, split_column, key_range, last_key)
+        target_adapter.cursor.execute(f"DELETE FROM {table_name} WHERE {where}", params or ())
+        target_adapter.commit()
+        checkpointer = RangeCheckpointer(checkpoints, table_name, range_id, split_column, rows_done)
+    where, params = build_range_where(source_adapter, split_column, key_range, last_key)
+    migrated = copy_table_rows(source_adapter, target_adapter, table_name, target_types, progress, total_rows,
+                               batch_size, where, params, stop_event, config, checkpointer, source_types, sizer)
+    if checkpointer is not None:
+        checkpointer.finish()
+        return checkpointer.rows
+    return migrated
+
+def copy_key_ranges(source_adapter, target_adapter, table_name, split_column, key_ranges, target_types,
+                    progress, total_rows, batch_size, config, parallel=True, checkpoints=None, source_types=None,
+                    sizer=None):
+    if not parallel:
+        return sum(
+            copy_key_range(source_adapter, target_adapter, table_name, split_column, range_id, key_range,
+                           target_types, progress, total_rows, batch_size, config, checkpoints=checkpoints,
+                           source_types=source_types, sizer=sizer)
+            for range_id, key_range in enumerate(key_ranges)
+        )
+    
+    # 每个范围使用独立的源/目标连接并发复制，任一范围失败时通知其余范围停止
+    stop_event = threading.Event()
+    root_causes = []  # 最先失败的范围的异常（其余范围因 stop_event 退出）
+    
+    def copy_range(range_id, key_range):
+        range_source, range_target = connect_adapters(config)
+        try:
+            return copy_key_range(range_source, range_target, table_name, split_column, range_id, key_range,
+                                  target_types, progress, total_rows, batch_size, config, stop_event, checkpoints,
+                                  source_types, sizer)
+        except Exception as e:
+            if not stop_event.is_set():
+                root_causes.append(e)
+            stop_event.set()
+            raise
+        finally:
+            release_adapters(range_source, range_target)
+    
+    with ThreadPoolExecutor(max_workers=len(key_ranges)) as executor:
+        futures = [executor.submit(copy_range, range_id, key_range) for range_id, key_range in enumerate(key_ranges)]
+        errors = []
+        migrated = 0
+        for future in futures:
+            try:
+                migrated += future.result()
+            except Exception as e:
+                errors.append(e)
+    if errors:
+        raise root_causes[0] if root_causes else errors[0]
+    return migrated
+
+def sync_table_delta(source_adapter, target_adapter, table_name, target_types, watermark_column, key_columns,
+                     last_mark, progress, total_rows, batch_size, watermarks, config=None, source_types=None):
+    # 增量同步：只拉取水位列大于上次高水位的行并 upsert 到目标表，返回同步行数
+    source_adapter.cursor.execute(f"SELECT MAX({watermark_column}) FROM {table_name}")
+    new_mark = source_adapter.cursor.fetchone()[0]
+    if new_mark is None or not new_mark > last_mark:
+        return 0
+    # 以本次开始时的最大值为上界，同步期间新写入的行留给下一次
+    lower_marker, upper_marker = source_adapter.get_placeholders(2).split(', ')
+    query = (f"SELECT * FROM {table_name} "
+             f"WHERE {watermark_column} > {lower_marker} AND {watermark_column} <= {upper_marker}")
+    columns_names, batches = source_adapter.stream_rows(query, batch_size, (last_mark, new_mark))
+    column_types = [target_types.get(c.lower()) or 'TEXT' for c in columns_names]
+    policy = CommitPolicy(target_adapter, table_name, config)
+    convert = build_row_converter(columns_names, source_types, target_types) if source_types else None
+    upsert = converting_writer(
+        target_adapter,
+        lambda batch: target_adapter.upsert_rows(table_name, columns_names, batch, key_columns, column_types),
+        convert)
+    migrated = 0
+    for seq, batch, fetch_seconds in timed_batches(batches):
+        if not is_running:
+            policy.rollback()
+            raise Exception("迁移被用户取消")
+        policy.write_batch(seq, batch, upsert, fetch_seconds)
+        migrated += len(batch)
+        progress.advance(table_name, len(batch), total_rows)
+    policy.finish()
+    watermarks.set(table_name, watermark_column, new_mark)
+    return migrated
+
+def apply_cdc_changes(target_adapter, table_name, changes, key_columns, target_types):
+    # 同一批内按主键只保留最后一次变更，删除和 upsert 的键互不重叠，因此无需保持先后顺序
+    latest = {}
+    for op, values in changes:
+        lowered = {k.lower(): v for k, v in values.items()}
+        latest[tuple(lowered.get(k.lower()) for k in key_columns)] = (op, values)
+    deletes = [key for key, (op, _) in latest.items() if op == 'delete']
+    upserts = [values for op, values in latest.values() if op == 'upsert']
+    if deletes:
+        target_adapter.delete_rows(table_name, key_columns, deletes)
+    if upserts:
+        columns = list(upserts[0])
+        rows = [tuple(values.get(c) for c in columns) for values in upserts]
+        column_types = [target_types.get(c.lower()) or 'TEXT' for c in columns]
+        target_adapter.upsert_rows(table_name, columns, rows, key_columns, column_types)
+
+def sync_table_cdc(source_adapter, target_adapter, table_name, target_types, table_options, key_columns,
+                   position, progress, total_rows, batch_size, watermarks, config=None):
+    # CDC 同步：读取上次位置之后的变更并按批应用到目标表，返回应用的变更数
+    end_position, change_batches = source_adapter.read_cdc_changes(table_name, position, table_options, batch_size)
+    policy = CommitPolicy(target_adapter, table_name, config)
+    apply = lambda changes: apply_cdc_changes(target_adapter, table_name, changes, key_columns, target_types)
+    applied = 0
+    for seq, changes, fetch_seconds in timed_batches(change_batches):
+        if not is_running:
+            policy.rollback()
+            raise Exception("迁移被用户取消")
+        policy.write_batch(seq, changes, apply, fetch_seconds)
+        applied += len(changes)
+        progress.advance(table_name, len(changes), total_rows)
+    policy.finish()
+    if end_position != position:
+        source_adapter.confirm_cdc_position(table_name, end_position, table_options)
+        watermarks.set(table_name, 'cdc', end_position)
+    return applied
+
+def run_index_sql(target_adapter, table_name, sql, config=None):
+    # 单个索引/约束失败（如重跑时已存在）只记录错误，不影响整张表
+    try:
+        if config is not None:
+            target_adapter.prepare_index_transaction(config)
+        target_adapter.cursor.execute(sql)
+        target_adapter.commit()
+        return True
+    except Exception as e:
+        target_adapter.conn.rollback()
+        log_error(f"索引/约束创建失败: {table_name} {sql} {str(e)}")
+        return False
+
+def build_deferred_indexes(target_adapter, table_name, indexes, config):
+    # 数据加载完成后再建主键和索引：先建主键（需要排他锁），其余索引在目标支持时多会话并行创建
+    if not indexes:
+        return 0.0
+    config = config or {}
+    start = time.perf_counter()
+    statements = [target_adapter.build_index_sql(table_name, index) for index in indexes]
+    if indexes[0]['primary']:
+        log_info(f"创建主键: {statements[0]}")
+        run_index_sql(target_adapter, table_name, statements.pop(0), config)
+    
+    # 并行建索引需要借出额外的目标连接；既没有连接池也没有目标库配置时（如直接调用 migrate_table）在当前连接上串行创建
+    index_workers = min(config.get('index_workers', 4), len(statements))
+    can_connect = 'target' in pools or 'target' in config
+    if statements and target_adapter.parallel_index_build and index_workers > 1 and can_connect:
+        def build(sql):
+            adapter = acquire_adapter(config, 'target')
+            try:
+                log_info(f"创建索引: {sql}")
+                run_index_sql(adapter, table_name, sql, config)
+            finally:
+                release_adapter(adapter, 'target')
+        with ThreadPoolExecutor(max_workers=index_workers) as executor:
+            list(executor.map(build, statements))
+    else:
+        for sql in statements:
+            log_info(f"创建索引: {sql}")
+            run_index_sql(target_adapter, table_name, sql, config)
+    return time.perf_counter() - start
+
+def build_target_columns(target_adapter, columns):
+    # 源表列定义 -> (小写列名到源类型, 小写列名到目标类型, 目标建表列定义)
+    source_types = {}
+    target_types = {}
+    column_defs = []
+    for col in columns:
+        name, sql_type, max_length = col[:3]
+        pg_type = target_adapter.map_type(sql_type, max_length)
+        source_types[name.lower()] = sql_type
+        target_types[name.lower()] = pg_type
+        column_defs.append(f"{name} {pg_type}")
+    return source_types, target_types, column_defs
+
+def build_foreign_keys(target_adapter, table_name, foreign_keys, loaded_tables):
+    # 引用表既未在本次加载、目标库中也不存在时跳过该外键
+    for foreign_key in foreign_keys:
+        if foreign_key['ref_table'] not in loaded_tables and not target_adapter.table_exists(foreign_key['ref_table']):
+            log_info(f"跳过外键 {foreign_key['name']}: 引用表 {foreign_key['ref_table']} 未迁移")
+            continue
+        sql = target_adapter.build_foreign_key_sql(table_name, foreign_key)
+        log_info(f"创建外键: {sql}")
+        run_index_sql(target_adapter, table_name, sql)
+
+def migrate_table(source_adapter, target_adapter, table_name, progress, total_rows,
+                  batch_size=DEFAULT_BATCH_SIZE, config=None, checkpoints=None, watermarks=None, schema=None):
+    # 返回 {'rows': 行数, 'full_load': 是否全量加载, 'load_seconds': 数据加载耗时, 'index_seconds': 索引创建耗时}
+    try:
+        # 获取表结构（未预加载时逐表查询）
+        columns = (schema or SchemaCache()).get_columns(source_adapter, table_name)
+
+        # 创建目标表
+        source_types, target_types, column_defs = build_target_columns(target_adapter, columns)
+        create_sql = target_adapter.build_create_table_sql(table_name, column_defs)
         
-        log_info(f"数据迁移完成: {len(rows)} 条记录", text_widget)
+        # 配置了水位列或 CDC 的表：已有同步位置且目标表存在时走增量同步，否则全量并记录本次起点
+        table_options = get_table_options(config, table_name)
+        sync_mode = None
+        if watermarks is not None:
+            sync_mode = 'cdc' if table_options.get('cdc') else 'watermark' if table_options.get('watermark') else None
+        if sync_mode:
+            mark_column = 'cdc' if sync_mode == 'cdc' else table_options['watermark']
+            # upsert 键必须唯一：水位列（如 updated_at）可能重复，不能代替 key
+            key_columns = table_options.get('key') or []
+            if isinstance(key_columns, str):
+                key_columns = [key_columns]
+            if not key_columns:
+                raise Exception(f"{'CDC' if sync_mode == 'cdc' else '增量'}同步需要配置 key: {table_name}")
+            last_mark = watermarks.get(table_name, mark_column)
+            resumable = last_mark is not None and target_adapter.table_exists(table_name)
+        if sync_mode == 'cdc':
+            if resumable:
+                log_info(f"CDC 同步: {table_name} (位置 {last_mark!r})")
+                applied = sync_table_cdc(source_adapter, target_adapter, table_name, target_types, table_options,
+                                         key_columns, last_mark, progress, total_rows, batch_size, watermarks,
+                                         config)
+                log_info(f"CDC 同步完成: {applied} 条变更")
+                return {'rows': applied, 'full_load': False, 'load_seconds': 0.0, 'index_seconds': 0.0}
+            start_mark = source_adapter.get_cdc_start_position(table_name, table_options)
+        elif sync_mode == 'watermark':
+            if resumable:
+                log_info(f"增量同步: {table_name} ({mark_column} > {last_mark})")
+                migrated = sync_table_delta(source_adapter, target_adapter, table_name, target_types,
+                                            mark_column, key_columns, last_mark, progress, total_rows,
+                                            batch_size, watermarks, config, source_types)
+                log_info(f"增量同步完成: {migrated} 条记录")
+                return {'rows': migrated, 'full_load': False, 'load_seconds': 0.0, 'index_seconds': 0.0}
+            source_adapter.cursor.execute(f"SELECT MAX({mark_column}) FROM {table_name}")
+            start_mark = source_adapter.cursor.fetchone()[0]
+        
+        # 检查点中有未完成且可续传的记录时保留目标表，从最后提交的键值继续
+        state = checkpoints.get_table(table_name) if checkpoints is not None else None
+        resume = state is not None and state['status'] == 'running' and state.get('split_column')
+        if resume:
+            log_info(f"从检查点继续迁移: {table_name}")
+            # 验证目标表仍存在
+            target_adapter.cursor.execute(f"SELECT * FROM {table_name} WHERE 1=0")
+        else:
+            log_info(f"执行建表SQL: {create_sql}")
+            target_adapter.cursor.execute(create_sql)
+            target_adapter.commit()
+        log_info(f"批量写入策略: {target_adapter.bulk_strategy} -> {table_name}")
+        
+        # 目标表只建列，主键/索引在加载完成后创建
+        indexes = []
+        if config is None or config.get('create_indexes', True):
+            indexes = source_adapter.get_index_definitions(table_name)
+        # 全量加载按字节自适应批大小（列式传输的批次由驱动决定，不参与）
+        sizer = None
+        if config and config.get('adaptive_batch') and config.get('transport', 'rows') != 'arrow':
+            sizer = BatchSizer(table_name, estimate_row_bytes(columns), config)
+        load_start = time.perf_counter()
+        
+        # 大表按主键范围拆分，多连接并发复制；启用检查点时即使不拆分也按拆分列有序读取以便续传
+        split_column, key_ranges = None, None
+        partitions = config.get('partitions', 1) if config else 1
+        if partitions > 1 and total_rows < config.get('partition_min_rows', DEFAULT_PARTITION_MIN_ROWS):
+            partitions = 1
+        if resume:
+            split_column, key_ranges = state['split_column'], checkpoints.get_ranges(table_name)
+        elif partitions > 1 or checkpoints is not None:
+            split_column, key_ranges = plan_key_ranges(source_adapter, table_name, partitions)
+            if checkpoints is not None:
+                checkpoints.start_table(table_name, split_column, key_ranges)
+        
+        parallel = len(key_ranges or []) > 2
+        if key_ranges:
+            if parallel:
+                log_info(f"按 {split_column} 拆分为 {len(key_ranges) - 1} 个范围并行复制: {table_name}")
+            migrated = copy_key_ranges(source_adapter, target_adapter, table_name, split_column, key_ranges,
+                                       target_types, progress, total_rows, batch_size, config, parallel, checkpoints,
+                                       source_types, sizer)
+        else:
+            migrated = copy_table_rows(source_adapter, target_adapter, table_name, target_types, progress,
+                                       total_rows, batch_size, config=config, source_types=source_types, sizer=sizer)
+        load_seconds = time.perf_counter() - load_start
+        if sizer is not None:
+            log_info(sizer.summary())
+        
+        index_seconds = build_deferred_indexes(target_adapter, table_name, indexes, config)
+        target_adapter.finish_fast_load(table_name)
+        if sync_mode:
+            # 源表已有相同列的主键/唯一索引时无需再建
+            key_set = {k.lower() for k in key_columns}
+            if not any(index['unique'] and {c.lower() for c in index['columns']} == key_set for index in indexes):
+                target_adapter.create_unique_key(table_name, key_columns)
+            if start_mark is not None:
+                watermarks.set(table_name, mark_column, start_mark)
+        if checkpoints is not None:
+            checkpoints.finish_table(table_name)
+        log_info(f"数据迁移完成: {migrated} 条记录，加载耗时 {load_seconds:.1f} 秒，"
+                 f"索引创建耗时 {index_seconds:.1f} 秒（{len(indexes)} 个）")
+        return {'rows': migrated, 'full_load': True, 'load_seconds': load_seconds, 'index_seconds': index_seconds}
         
     except Exception as e:
-        log_error(f"迁移失败: {table_name} {str(e)}", text_widget)
+        log_error(f"迁移失败: {table_name} {str(e)}")
         raise
 
-def migrate_tables(source_adapter, target_adapter, tables, text_widget, progress):
-    total_tables = len(tables)
-    for idx, table in enumerate(tables):
+def migrate_table_with_retry(source_adapter, target_adapter, table_name, progress, total_rows,
+                             batch_size=DEFAULT_BATCH_SIZE, config=None, checkpoints=None, watermarks=None,
+                             schema=None):
+    # 批次级重放之外的兜底：源库断线、提交失败等瞬时错误时重连两端并重新迁移该表。
+    # 启用检查点时从最后提交的键值续传，否则 migrate_table 会重建目标表，不会留下半张表的重复数据
+    attempts = (config or {}).get('retry_attempts', DEFAULT_RETRY_ATTEMPTS)
+    attempt = 0
+    while True:
+        try:
+            return migrate_table(source_adapter, target_adapter, table_name, progress, total_rows,
+                                 batch_size, config, checkpoints, watermarks, schema)
+        except Exception as e:
+            transient = source_adapter.is_transient_error(e) or target_adapter.is_transient_error(e)
+            if not transient or attempt >= attempts or not is_running:
+                raise
+            delay = retry_delay(attempt, config)
+            attempt += 1
+            log_info(f"表 {table_name} 遇到瞬时错误，{delay:.1f} 秒后重连并重试（第 {attempt} 次）: {str(e)}", "orange")
+            wait_for_retry(delay)
+            source_adapter.reconnect()
+            target_adapter.reconnect()
+            progress.restart(table_name)
+
+def load_row_estimates(source_adapter, tables, config):
+    # 行数只用于进度和大表优先调度，默认取统计信息估算值；exact_row_counts 时全部精确计数
+    if config is None or not config.get('exact_row_counts'):
+        return source_adapter.get_row_estimates(tables)
+    return {}
+
+
+def count_table_rows(source_adapter, table, estimates):
+    # 没有估算值的表（或要求精确计数时）用 COUNT(*)
+    total_rows = estimates.get(table.lower())
+    if total_rows is None:
+        source_adapter.cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        total_rows = source_adapter.cursor.fetchone()[0]
+    return total_rows
+
+
+def migrate_tables(source_adapter, target_adapter, tables, batch_size=DEFAULT_BATCH_SIZE,
+                   workers=1, config=None, checkpoints=None, watermarks=None, schema=None):
+    # 预检：表存在性与行数，行数同时用于大表优先调度；列定义一次性批量加载
+    if schema is None:
+        schema = SchemaCache()
+    schema.load(source_adapter, [t for t in tables if checkpoints is None or not checkpoints.is_done(t)])
+    estimates = load_row_estimates(source_adapter, tables, config)
+    pending = []
+    failed_tables = []
+    for table in tables:
         if not is_running:
             raise Exception("迁移被用户取消")
         
+        if checkpoints is not None and checkpoints.is_done(table):
+            log_info(f"检查点显示已完成，跳过: {table}")
+            continue
+        
         # 表存在性验证
+        if not schema.exists(source_adapter, table):
+            log_error(f"源表不存在: {table}")
+            continue
+        
+        pending.append((table, count_table_rows(source_adapter, table, estimates)))
+    
+    pending.sort(key=lambda item: item[1], reverse=True)
+    tracker = MigrationProgress(len(pending))
+    results = {}
+    work_queue = queue.Queue()
+    for item in pending:
+        work_queue.put(item)
+    
+    def run_worker(worker_source, worker_target):
+        while is_running:
+            try:
+                table, total_rows = work_queue.get_nowait()
+            except queue.Empty:
+                return
+            log_info(f"正在迁移表 {table}...")
+            metrics.start_table(table)
+            try:
+                results[table] = migrate_table_with_retry(worker_source, worker_target, table, tracker, total_rows,
+                                                          batch_size, config, checkpoints, watermarks, schema)
+            except Exception as e:
+                log_error(f"表迁移失败: {table} {str(e)}")
+                failed_tables.append(table)
+                continue
+            finally:
+                metrics.finish_table(table)
+            tracker.finish(table)
+    
+    def run_pooled_worker(worker_id):
         try:
-            source_adapter.cursor.execute(f"SELECT 1 FROM {table} WHERE 1=0")
-            source_adapter.cursor.fetchone()
+            worker_source, worker_target = connect_adapters(config)
         except Exception as e:
-            log_error(f"源表不存在: {table}", text_widget)
-            continue
+            log_error(f"工作线程 {worker_id} 连接数据库失败: {str(e)}")
+            return
+        try:
+            run_worker(worker_source, worker_target)
+        finally:
+            release_adapters(worker_source, worker_target)
+    
+    workers = min(workers, len(pending))
+    if workers <= 1 or config is None:
+        run_worker(source_adapter, target_adapter)
+    else:
+        log_info(f"并行迁移: {workers} 个工作线程")
+        threads = [
+            threading.Thread(target=run_pooled_worker, args=(i + 1,), daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    if not is_running:
+        raise Exception("迁移被用户取消")
+    if not work_queue.empty():
+        raise Exception(f"有 {work_queue.qsize()} 张表未能迁移（工作线程均已退出）")
+    
+    # 外键依赖被引用表的主键，所有表加载完成后统一创建（增量同步的表不重复创建）
+    foreign_key_seconds = 0.0
+    if results and (config is None or config.get('create_foreign_keys', True)):
+        start = time.perf_counter()
+        for table in [t for t, r in results.items() if r['full_load']]:
+            build_foreign_keys(target_adapter, table, source_adapter.get_foreign_keys(table), results)
+        foreign_key_seconds = time.perf_counter() - start
+    if results:
+        load_seconds = sum(r['load_seconds'] for r in results.values())
+        index_seconds = sum(r['index_seconds'] for r in results.values())
+        log_info(f"汇总: {len(results)} 张表，数据加载 {load_seconds:.1f} 秒，索引创建 {index_seconds:.1f} 秒，"
+                 f"外键创建 {foreign_key_seconds:.1f} 秒")
+    # 全部成功后清空检查点，下次运行重新全量迁移
+    if checkpoints is not None and not failed_tables:
+        checkpoints.clear()
+    if failed_tables:
+        raise Exception(f"{len(failed_tables)} 张表迁移失败: {failed_tables}")
 
-        log_info(f"正在迁移表 {table}...", text_widget)
-        
-        # 获取行数
-        source_adapter.cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        total_rows = source_adapter.cursor.fetchone()[0]
+# ---------------- asyncio 引擎（engine: async）----------------
+# 适用于多表、高延迟链路：单线程事件循环同时推进多张表，每张表占用一对独立连接。
+# PostgreSQL 使用 asyncpg（目标端 copy_records_to_table），MySQL 使用 aiomysql，
+# SQL Server/Oracle 以及未安装异步驱动时把同步适配器的阻塞调用放到线程池执行。
+# 只做全量加载（含延后建索引和外键），检查点续传、增量/CDC 同步仍使用线程引擎。
 
+# 同时迁移的表数上限（可在配置文件中通过 async_concurrency 覆盖）
+DEFAULT_ASYNC_CONCURRENCY = 16
+
+class AsyncDatabaseAdapter:
+    # 与 DatabaseAdapter 对应的异步接口；SQL 文本（列查询、类型映射、建表/索引语句）复用同类型同步适配器
+    bulk_strategy = 'executemany'
+    
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.conn = None
+    
+    async def connect(self, config):
+        raise NotImplementedError
+    
+    async def disconnect(self):
+        raise NotImplementedError
+    
+    async def execute(self, sql):
+        raise NotImplementedError
+    
+    async def fetch_all(self, sql):
+        raise NotImplementedError
+    
+    async def stream_rows(self, query, batch_size=DEFAULT_BATCH_SIZE):
+        # 返回 (列名, 按批产出行的异步生成器)
+        raise NotImplementedError
+    
+    async def bulk_insert(self, table_name, columns, rows, column_types=None):
+        raise NotImplementedError
+    
+    async def commit(self):
+        raise NotImplementedError
+    
+    async def rollback(self):
+        raise NotImplementedError
+    
+    async def begin_fast_load_session(self):
+        # 连接建立后调用，仅在 fast_load 时生效
+        pass
+    
+    async def finish_fast_load(self, table_name):
+        pass
+    
+    async def get_columns(self, table_name):
+        return await self.fetch_all(self.dialect.get_columns_query(table_name))
+    
+    async def get_index_definitions(self, table_name):
+        return group_index_rows(await self.fetch_all(self.dialect.get_index_query(table_name)))
+    
+    async def get_foreign_keys(self, table_name):
+        return group_foreign_key_rows(await self.fetch_all(self.dialect.get_foreign_key_query(table_name)))
+    
+    async def get_row_estimates(self, table_names):
+        estimates = {}
+        for i in range(0, len(table_names), SCHEMA_QUERY_CHUNK):
+            query = self.dialect.get_row_estimate_query(table_names[i:i + SCHEMA_QUERY_CHUNK])
+            if query is None:
+                break
+            estimates.update(group_row_estimates(await self.fetch_all(query)))
+        return estimates
+    
+    async def get_all_tables(self):
+        raise NotImplementedError
+
+class ExecutorAdapter(AsyncDatabaseAdapter):
+    # 包装同步适配器，阻塞调用在线程池中执行（同一连接上的调用依次 await，不会并发）
+    def __init__(self, dialect):
+        super().__init__(dialect)
+        self.bulk_strategy = dialect.bulk_strategy
+    
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def connect(self, config):
+        await self._run(self.dialect.connect, config)
+        self.conn = self.dialect.conn
+    
+    async def disconnect(self):
+        await self._run(self.dialect.disconnect)
+    
+    async def execute(self, sql):
+        await self._run(self.dialect.cursor.execute, sql)
+    
+    async def fetch_all(self, sql):
+        def fetch():
+            self.dialect.cursor.execute(sql)
+            return self.dialect.cursor.fetchall()
+        return await self._run(fetch)
+    
+    async def stream_rows(self, query, batch_size=DEFAULT_BATCH_SIZE):
+        columns, batches = await self._run(self.dialect.stream_rows, query, batch_size)
+        return columns, self._iter_batches(batches)
+    
+    async def _iter_batches(self, batches):
+        try:
+            while True:
+                batch = await self._run(next, batches, None)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            batches.close()
+    
+    async def bulk_insert(self, table_name, columns, rows, column_types=None):
+        await self._run(self.dialect.bulk_insert, table_name, columns, rows, column_types)
+    
+    async def commit(self):
+        await self._run(self.dialect.commit)
+    
+    async def rollback(self):
+        await self._run(self.dialect.rollback)
+    
+    async def begin_fast_load_session(self):
+        await self._run(self.dialect.begin_fast_load_session)
+    
+    async def finish_fast_load(self, table_name):
+        await self._run(self.dialect.finish_fast_load, table_name)
+    
+    async def get_all_tables(self):
+        return await self._run(self.dialect.get_all_tables)
+
+# asyncpg 的二进制编解码只接受 str 写入这些列，源类型映射为 TEXT/MONEY 等的非字符串值需先转为文本
+ASYNCPG_TEXT_TARGETS = {'TEXT', 'VARCHAR', 'CHAR', 'XML', 'MONEY'}
+
+def _asyncpg_text_row(row, indexes):
+    row = list(row)
+    for i in indexes:
+        value = row[i]
+        if value is not None and type(value) is not str:
+            row[i] = _pg_text_value(value)
+    return row
+
+class AsyncPGAdapter(AsyncDatabaseAdapter):
+    bulk_strategy = 'copy_records'
+    
+    def __init__(self, dialect):
+        super().__init__(dialect)
+        self.transaction = None
+    
+    async def connect(self, config):
+        import asyncpg
+        # psycopg2 的连接参数名 dbname 在 asyncpg 中为 database
+        params = dict(config)
+        if 'dbname' in params:
+            params['database'] = params.pop('dbname')
+        self.conn = await asyncpg.connect(**params)
+    
+    async def disconnect(self):
+        if self.conn is not None:
+            await self.conn.close()
+    
+    async def _begin(self):
+        # asyncpg 默认每条语句自动提交，写入和游标读取都放在显式事务中
+        if self.transaction is None:
+            self.transaction = self.conn.transaction()
+            await self.transaction.start()
+    
+    async def execute(self, sql):
+        await self._begin()
+        await self.conn.execute(sql)
+    
+    async def fetch_all(self, sql):
+        return [tuple(record) for record in await self.conn.fetch(sql)]
+    
+    async def stream_rows(self, query, batch_size=DEFAULT_BATCH_SIZE):
+        await self._begin()
+        statement = await self.conn.prepare(query)
+        columns = [attribute.name for attribute in statement.get_attributes()]
+        cursor = await statement.cursor()
+        return columns, self._iter_batches(cursor, batch_size)
+    
+    async def _iter_batches(self, cursor, batch_size):
+        while True:
+            records = await cursor.fetch(batch_size)
+            if not records:
+                return
+            yield [tuple(record) for record in records]
+    
+    async def bulk_insert(self, table_name, columns, rows, column_types=None):
+        # 二进制 COPY，一批一次往返；asyncpg 会给标识符加引号，按未加引号建表时的小写名传入
+        text_indexes = [i for i, col_type in enumerate(column_types or [])
+                        if split_column_type(col_type)[0] in ASYNCPG_TEXT_TARGETS]
+        if text_indexes:
+            rows = [_asyncpg_text_row(row, text_indexes) for row in rows]
+        await self._begin()
+        await self.conn.copy_records_to_table(table_name.lower(), records=rows, columns=[c.lower() for c in columns])
+    
+    async def commit(self):
+        if self.transaction is not None:
+            transaction, self.transaction = self.transaction, None
+            await transaction.commit()
+    
+    async def rollback(self):
+        if self.transaction is not None:
+            transaction, self.transaction = self.transaction, None
+            await transaction.rollback()
+    
+    async def begin_fast_load_session(self):
+        if self.dialect.fast_load:
+            await self.conn.execute("SET synchronous_commit = off")
+    
+    async def finish_fast_load(self, table_name):
+        if self.dialect.fast_load:
+            await self.execute(f"ALTER TABLE {table_name} SET LOGGED")
+            await self.commit()
+    
+    async def get_all_tables(self):
+        return [row[0].lower() for row in await self.fetch_all("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = 'public' AND table_type = 'BASE TABLE'
+        """)]
+
+class AIOMySQLAdapter(AsyncDatabaseAdapter):
+    bulk_strategy = 'multi_row_insert'
+    
+    async def connect(self, config):
+        import aiomysql
+        # mysql.connector 的连接参数名 database 在 aiomysql 中为 db
+        params = dict(config)
+        if 'database' in params:
+            params['db'] = params.pop('database')
+        self.conn = await aiomysql.connect(autocommit=False, **params)
+        self.cursor_class = aiomysql.SSCursor
+    
+    async def disconnect(self):
+        if self.conn is not None:
+            self.conn.close()
+    
+    async def execute(self, sql):
+        # 建表语句为 "DROP ...; CREATE ..."，逐条执行
+        async with self.conn.cursor() as cursor:
+            for statement in sql.split(';'):
+                if statement.strip():
+                    await cursor.execute(statement)
+    
+    async def fetch_all(self, sql):
+        async with self.conn.cursor() as cursor:
+            await cursor.execute(sql)
+            return await cursor.fetchall()
+    
+    async def stream_rows(self, query, batch_size=DEFAULT_BATCH_SIZE):
+        # 非缓冲游标，服务端逐批返回
+        cursor = await self.conn.cursor(self.cursor_class)
+        await cursor.execute(query)
+        columns = [desc[0] for desc in cursor.description]
+        return columns, self._iter_batches(cursor, batch_size)
+    
+    async def _iter_batches(self, cursor, batch_size):
         try:
-            migrate_table(source_adapter, target_adapter, table, text_widget, progress, total_rows)
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            await cursor.close()
+    
+    async def bulk_insert(self, table_name, columns, rows, column_types=None):
+        # aiomysql 的 executemany 会把 INSERT ... VALUES 合并为多行语句
+        sql = self.dialect.build_insert_sql(table_name, columns)
+        async with self.conn.cursor() as cursor:
+            await cursor.executemany(sql, rows)
+    
+    async def commit(self):
+        await self.conn.commit()
+    
+    async def rollback(self):
+        await self.conn.rollback()
+    
+    async def begin_fast_load_session(self):
+        if self.dialect.fast_load:
+            await self.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+    
+    async def get_all_tables(self):
+        return [row[0].lower() for row in await self.fetch_all("SHOW TABLES")]
+
+def get_async_adapter(db_type):
+    # 未安装 asyncpg/aiomysql 时退回线程池包装的同步适配器
+    dialect = get_adapter(db_type)
+    native = {'postgres': ('asyncpg', AsyncPGAdapter), 'mysql': ('aiomysql', AIOMySQLAdapter)}.get(db_type)
+    if native is not None:
+        module_name, adapter_class = native
+        try:
+            __import__(module_name)
+            return adapter_class(dialect)
+        except ImportError:
+            log_info(f"未安装 {module_name}，{db_type} 使用线程池执行同步驱动")
+    return ExecutorAdapter(dialect)
+
+async def connect_async_adapters(config):
+    source_adapter = get_async_adapter(config['source']['type'])
+    target_adapter = get_async_adapter(config['target']['type'])
+    # 建表语句（UNLOGGED/NOLOGGING）和写入设置由目标方言按配置生成
+    configure_target(target_adapter.dialect, config)
+    await source_adapter.connect(config['source']['config'])
+    try:
+        await target_adapter.connect(config['target']['config'])
+        await target_adapter.begin_fast_load_session()
+    except Exception:
+        await source_adapter.disconnect()
+        raise
+    return source_adapter, target_adapter
+
+async def async_build_indexes(target_adapter, table_name, indexes):
+    start = time.perf_counter()
+    for index in indexes:
+        sql = target_adapter.dialect.build_index_sql(table_name, index)
+        log_info(f"创建{'主键' if index['primary'] else '索引'}: {sql}")
+        try:
+            await target_adapter.execute(sql)
+            await target_adapter.commit()
         except Exception as e:
-            log_error(f"表迁移失败: {table} {str(e)}", text_widget)
-            continue
+            await target_adapter.rollback()
+            log_error(f"索引/约束创建失败: {table_name} {sql} {str(e)}")
+    return time.perf_counter() - start
+
+async def async_migrate_table(source_adapter, target_adapter, table_name, progress, total_rows, batch_size, config):
+    # 与 migrate_table 的全量路径一致：建表 -> 流式复制（按 commit_rows 提交）-> 建主键/索引
+    columns = await source_adapter.get_columns(table_name)
+    source_types = {}
+    target_types = {}
+    column_defs = []
+    for col in columns:
+        name, sql_type, max_length = col[:3]
+        target_type = target_adapter.dialect.map_type(sql_type, max_length)
+        source_types[name.lower()] = sql_type
+        target_types[name.lower()] = target_type
+        column_defs.append(f"{name} {target_type}")
+    create_sql = target_adapter.dialect.build_create_table_sql(table_name, column_defs)
+    log_info(f"执行建表SQL: {create_sql}")
+    await target_adapter.execute(create_sql)
+    await target_adapter.commit()
+    log_info(f"批量写入策略: {target_adapter.bulk_strategy} -> {table_name}")
+    
+    indexes = []
+    if config.get('create_indexes', True):
+        indexes = await source_adapter.get_index_definitions(table_name)
+    load_start = time.perf_counter()
+    columns_names, batches = await source_adapter.stream_rows(f"SELECT * FROM {table_name}", batch_size)
+    column_types = [target_types.get(c.lower()) or 'TEXT' for c in columns_names]
+    convert = build_row_converter(columns_names, source_types, target_types)
+    commit_rows = config.get('commit_rows', DEFAULT_COMMIT_ROWS)
+    migrated = 0
+    pending = 0
+    try:
+        seq = 0
+        while True:
+            start = time.perf_counter()
+            batch = await batches.__anext__()
+            fetch_seconds = time.perf_counter() - start
+            if not is_running:
+                raise Exception("迁移被用户取消")
+            convert_seconds = 0.0
+            rows = batch
+            if convert is not None:
+                start = time.perf_counter()
+                rows = convert(batch)
+                convert_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            await target_adapter.bulk_insert(table_name, columns_names, rows, column_types)
+            write_seconds = time.perf_counter() - start
+            commit_seconds = 0.0
+            pending += len(batch)
+            if commit_rows and pending >= commit_rows:
+                start = time.perf_counter()
+                await target_adapter.commit()
+                commit_seconds = time.perf_counter() - start
+                pending = 0
+            if metrics.enabled:
+                metrics.record_batch(table_name, seq, len(batch), estimate_batch_bytes(batch),
+                                     {'fetch': fetch_seconds, 'convert': convert_seconds, 'write': write_seconds,
+                                      'commit': commit_seconds})
+            migrated += len(batch)
+            seq += 1
+            progress.advance(table_name, len(batch), total_rows)
+    except StopAsyncIteration:
+        pass
+    except Exception:
+        await target_adapter.rollback()
+        raise
+    finally:
+        await batches.aclose()
+    await target_adapter.commit()
+    load_seconds = time.perf_counter() - load_start
+    index_seconds = await async_build_indexes(target_adapter, table_name, indexes)
+    await target_adapter.finish_fast_load(table_name)
+    log_info(f"数据迁移完成: {migrated} 条记录，加载耗时 {load_seconds:.1f} 秒，"
+             f"索引创建耗时 {index_seconds:.1f} 秒（{len(indexes)} 个）")
+    return {'rows': migrated, 'full_load': True, 'load_seconds': load_seconds, 'index_seconds': index_seconds}
+
+async def async_migrate_tables(config, tables=None, migrate_all=False):
+    # 每张表一对连接，信号量限制同时在途的表数
+    concurrency = config.get('async_concurrency', DEFAULT_ASYNC_CONCURRENCY)
+    batch_size = config.get('batch_size', DEFAULT_BATCH_SIZE)
+    # 线程池包装的同步驱动每张表占两个线程（源、目标）
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 2))
+    
+    source_adapter, target_adapter = await connect_async_adapters(config)
+    idle_pairs = []  # 已完成的表归还的连接对，后续表直接复用，最多 concurrency 对
+    try:
+        if isinstance(target_adapter, AsyncPGAdapter) and config.get('copy_format', 'text') != 'text':
+            log_info("asyncpg 固定使用二进制 COPY（copy_records_to_table），copy_format 不生效")
+        if migrate_all:
+            tables = await source_adapter.get_all_tables()
+        elif not tables:
+            tables = get_table_names(config)
+        log_info(f"本次迁移表列表: {tables}（async 引擎，最多 {concurrency} 张表并行）")
+        estimates = {}
+        if not config.get('exact_row_counts'):
+            estimates = await source_adapter.get_row_estimates(tables)
+        progress = MigrationProgress(len(tables))
+        semaphore = asyncio.Semaphore(concurrency)
+        results = {}
+        failed_tables = []
+        
+        async def release_pair(pair):
+            try:
+                for adapter in pair:
+                    await adapter.rollback()
+                idle_pairs.append(pair)
+            except Exception:
+                for adapter in pair:
+                    try:
+                        await adapter.disconnect()
+                    except Exception:
+                        pass
+        
+        async def run_table(table):
+            async with semaphore:
+                if not is_running:
+                    return
+                metrics.start_table(table)
+                try:
+                    pair = idle_pairs.pop() if idle_pairs else await connect_async_adapters(config)
+                    table_source, table_target = pair
+                    try:
+                        # 有估算值说明表存在于目录中，否则用 COUNT(*) 同时验证表存在
+                        total_rows = estimates.get(table.lower())
+                        if total_rows is None:
+                            try:
+                                total_rows = (await table_source.fetch_all(f"SELECT COUNT(*) FROM {table}"))[0][0]
+                            except Exception:
+                                log_error(f"源表不存在: {table}")
+                                return
+                        log_info(f"正在迁移表 {table}...")
+                        results[table] = await async_migrate_table(table_source, table_target, table, progress,
+                                                                   total_rows, batch_size, config)
+                    finally:
+                        await release_pair(pair)
+                except Exception as e:
+                    log_error(f"表迁移失败: {table} {str(e)}")
+                    failed_tables.append(table)
+                finally:
+                    metrics.finish_table(table)
+                    progress.finish(table)
+        
+        await asyncio.gather(*(run_table(table) for table in tables))
+        if not is_running:
+            raise Exception("迁移被用户取消")
+        
+        # 外键在所有表加载完成后统一创建
+        foreign_key_seconds = 0.0
+        if results and config.get('create_foreign_keys', True):
+            start = time.perf_counter()
+            for table in results:
+                for foreign_key in await source_adapter.get_foreign_keys(table):
+                    if foreign_key['ref_table'] not in results:
+                        log_info(f"跳过外键 {foreign_key['name']}: 引用表 {foreign_key['ref_table']} 未迁移")
+                        continue
+                    sql = target_adapter.dialect.build_foreign_key_sql(table, foreign_key)
+                    log_info(f"创建外键: {sql}")
+                    try:
+                        await target_adapter.execute(sql)
+                        await target_adapter.commit()
+                    except Exception as e:
+                        await target_adapter.rollback()
+                        log_error(f"索引/约束创建失败: {table} {sql} {str(e)}")
+            foreign_key_seconds = time.perf_counter() - start
+        if results:
+            load_seconds = sum(r['load_seconds'] for r in results.values())
+            index_seconds = sum(r['index_seconds'] for r in results.values())
+            log_info(f"汇总: {len(results)} 张表，数据加载 {load_seconds:.1f} 秒，索引创建 {index_seconds:.1f} 秒，"
+                     f"外键创建 {foreign_key_seconds:.1f} 秒")
+        if failed_tables:
+            raise Exception(f"{len(failed_tables)} 张表迁移失败: {failed_tables}")
+    finally:
+        for pair in [(source_adapter, target_adapter)] + idle_pairs:
+            for adapter in pair:
+                await adapter.disconnect()
+
+def check_async_config(config):
+    # async 引擎只做全量加载，依赖检查点/水位/CDC 的配置交给线程引擎
+    if config.get('checkpoint'):
+        raise Exception("async 引擎不支持检查点续传，请使用 engine: threads")
+    for table in config.get('tables') or []:
+        if isinstance(table, dict) and (table.get('watermark') or table.get('cdc')):
+            raise Exception(f"async 引擎不支持增量/CDC 同步: {table['name']}，请使用 engine: threads")
+
+def run_migration(config, tables=None, migrate_all=False):
+    # 无界面的迁移入口：进度和日志通过 listeners 通知，失败时抛出异常；调用方负责设置 is_running
+    if config.get('engine') == 'async':
+        check_async_config(config)
+        metrics.start(config)
+        try:
+            asyncio.run(async_migrate_tables(config, tables, migrate_all))
+        finally:
+            metrics.stop()
+        return
+    if config.get('transport') == 'arrow' and pa is None:
+        raise Exception("transport: arrow 需要安装 pyarrow（pip install pyarrow）")
+    if config.get('transport') == 'arrow' and config.get('adaptive_batch'):
+        log_info("adaptive_batch 对 transport: arrow 不生效，列式传输按固定 batch_size 读写", "orange")
+    if config.get('checkpoint') and config.get('fast_load') and config['target']['type'] == 'postgres':
+        # 崩溃后 UNLOGGED 表被清空、synchronous_commit=off 可能丢失最近提交的事务，而检查点已把这些批次记为完成，续传会跳过
+        raise Exception("PostgreSQL 目标的 fast_load 与 checkpoint 不能同时开启（崩溃后已提交的行可能丢失），请关闭其中之一")
+    print(f"源数据库类型: {config['source']['type']}, 目标数据库类型: {config['target']['type']}")
+    # 工作线程、并行范围、流水线写线程和建索引会话都从连接池借用连接，避免每张表重复握手
+    open_pools(config)
+    source_adapter = target_adapter = None
+    try:
+        log_info("正在连接源数据库...")
+        source_adapter = acquire_adapter(config, 'source')
+        log_info("正在连接目标数据库...")
+        target_adapter = acquire_adapter(config, 'target')
+        
+        if migrate_all:
+            tables = source_adapter.get_all_tables()
+        elif not tables:
+            tables = get_table_names(config)
+        log_info(f"本次迁移表列表: {tables}")
         
-        step_value = 100 / total_tables
-        root.after(0, progress.step, step_value)
-        root.update_idletasks()
+        batch_size = config.get('batch_size', DEFAULT_BATCH_SIZE)
+        workers = config.get('workers', 1)
+        checkpoints = None
+        if config.get('checkpoint'):
+            checkpoints = CheckpointStore(config.get('checkpoint_file', 'sync_table.checkpoint.json'))
+        watermarks = WatermarkStore(config.get('watermark_file', 'sync_table.watermarks.json'))
+        schema = SchemaCache(config.get('schema_cache_file') or None)
+        metrics.start(config)
+        migrate_tables(source_adapter, target_adapter, tables, batch_size, workers, config, checkpoints, watermarks,
+                       schema)
+    finally:
+        metrics.stop()
+        if source_adapter is not None:
+            release_adapter(source_adapter, 'source')
+        if target_adapter is not None:
+            release_adapter(target_adapter, 'target')
+        close_pools()
 
-def run_migration_task(root, text_widget, progress, migrate_all):
-    global is_running
-    config = load_config()
-    source_type = config['source']['type']
-    target_type = config['target']['type']
+# ---------------- 数据校验（verify）----------------
+# 按拆分列把每张表切成若干区间，两端在库内分别计算区间行数和行哈希之和（见 DatabaseAdapter.build_checksum_query），
+# 只传回两个数字；不一致的区间二分下钻，直到区间行数不超过 verify_min_chunk_rows，定位到具体键值范围
+
+# 每张表初始切分的区间数、下钻停止的区间行数、并行查询的区间数（可在配置文件中通过 verify_* 覆盖）
+DEFAULT_VERIFY_CHUNKS = 16
+DEFAULT_VERIFY_MIN_CHUNK_ROWS = 1000
+DEFAULT_VERIFY_WORKERS = 4
+
+# 每张表最多报告的不一致区间数，超过后停止下钻
+VERIFY_MAX_MISMATCHES = 20
+
+def describe_key_range(split_column, key_range):
+    if split_column is None:
+        return "全表"
+    if key_range is None:
+        return f"{split_column} IS NULL"
+    low, high, inclusive = key_range
+    return f"{split_column} >= {low!r} AND {split_column} {'<=' if inclusive else '<'} {high!r}"
+
+def checksum_key_range(config, table_name, columns, split_column, key_range):
+    # 两端各借一个连接计算同一区间，返回 [(源行数, 源哈希和), (目标行数, 目标哈希和)]
+    results = []
+    for role, kinds in (('source', [(name, kind) for name, kind, _ in columns]),
+                        ('target', [(name, kind) for name, _, kind in columns])):
+        adapter = acquire_adapter(config, role)
+        try:
+            where, params = ('1=1', None) if split_column is None else \
+                build_range_where(adapter, split_column, key_range)
+            query = adapter.build_checksum_query(table_name, kinds, where)
+            if params:
+                adapter.cursor.execute(query, params)
+            else:
+                adapter.cursor.execute(query)
+            count, digest = adapter.cursor.fetchone()
+        finally:
+            release_adapter(adapter, role)
+        results.append((count, int(digest or 0)))
+    return results
+
+def bisect_key_range(key_range):
+    # 保留原区间是否包含上界；无法再分（上下界之间没有更多取值）时返回 None
+    low, high, inclusive = key_range
+    halves = split_key_range(low, high, 2)
+    if len(halves) < 2:
+        return None
+    return [halves[0], (halves[1][0], halves[1][1], inclusive)]
+
+def verify_table(executor, source_adapter, target_adapter, table_name, source_schema, target_schema, config):
+    # 返回不一致区间列表 [(区间描述, 源行数, 目标行数)]，为空表示两端一致
+    chunks = config.get('verify_chunks', DEFAULT_VERIFY_CHUNKS)
+    min_rows = config.get('verify_min_chunk_rows', DEFAULT_VERIFY_MIN_CHUNK_ROWS)
+    target_kinds = {}
+    for name, data_type, _ in target_schema.get_columns(target_adapter, table_name):
+        target_kinds[name.lower()] = classify_checksum_type(data_type)
+    columns = []
+    skipped = []
+    for name, data_type, _ in source_schema.get_columns(source_adapter, table_name):
+        source_kind = classify_checksum_type(data_type)
+        target_kind = target_kinds.get(name.lower())
+        # 两端类别不同（如 SQL Server date 映射为 PostgreSQL TEXT）时文本形式不一致，只比对行数
+        if source_kind and source_kind == target_kind:
+            columns.append((name, source_kind, target_kind))
+        else:
+            skipped.append(name)
+    if skipped:
+        log_info(f"{table_name}: 以下列不参与哈希比对，只比对行数: {', '.join(skipped)}")
     
-    source_adapter = get_adapter(source_type)
-    target_adapter = get_adapter(target_type)
-    print(f"源数据库类型: {source_type}, 目标数据库类型: {target_type}")
+    # 按源表拆分列的 MIN/MAX 切分；另查目标表中超出源表键值范围的行
+    mismatches = []
+    split_column = source_adapter.get_split_column(table_name)
+    key_ranges = [None]
+    if split_column:
+        source_adapter.cursor.execute(f"SELECT MIN({split_column}), MAX({split_column}) FROM {table_name}")
+        low, high = source_adapter.cursor.fetchone()
+        query = f"SELECT COUNT(*) FROM {table_name} WHERE {split_column} IS NOT NULL"
+        if low is None:
+            target_adapter.cursor.execute(query)
+        else:
+            key_ranges = split_key_range(low, high, chunks) + [None]
+            markers = target_adapter.get_placeholders(2).split(', ')
+            query += f" AND ({split_column} < {markers[0]} OR {split_column} > {markers[1]})"
+            target_adapter.cursor.execute(query, (low, high))
+        extra_rows = target_adapter.cursor.fetchone()[0]
+        if extra_rows:
+            mismatches.append((f"超出源表 {split_column} 范围", 0, extra_rows))
+    
+    results = executor.map(lambda key_range: checksum_key_range(config, table_name, columns, split_column, key_range),
+                           key_ranges)
+    pending = [(key_range, result) for key_range, result in zip(key_ranges, results) if result[0] != result[1]]
+    # 不一致的区间逐层二分，每层的所有子区间并行计算
+    while pending and is_running:
+        next_level = []
+        for key_range, (source, target) in pending:
+            halves = None
+            if key_range is not None and max(source[0], target[0]) > min_rows:
+                halves = bisect_key_range(key_range)
+            if halves is None:
+                mismatches.append((describe_key_range(split_column, key_range), source[0], target[0]))
+            else:
+                next_level.extend(halves)
+        if len(mismatches) >= VERIFY_MAX_MISMATCHES:
+            break
+        results = executor.map(lambda key_range: checksum_key_range(config, table_name, columns, split_column,
+                                                                    key_range), next_level)
+        pending = [(key_range, result) for key_range, result in zip(next_level, results) if result[0] != result[1]]
+    return mismatches[:VERIFY_MAX_MISMATCHES]
+
+def run_verification(config, tables=None, verify_all=False):
+    # 校验入口：逐表比对，区间查询在 verify_workers 个连接上并行；返回不一致的表名列表
+    open_pools(config)
+    source_adapter = target_adapter = None
+    try:
+        source_adapter = acquire_adapter(config, 'source')
+        target_adapter = acquire_adapter(config, 'target')
+        if verify_all:
+            tables = source_adapter.get_all_tables()
+        elif not tables:
+            tables = get_table_names(config)
+        log_info(f"本次校验表列表: {tables}")
+        source_schema, target_schema = SchemaCache(), SchemaCache()
+        source_schema.load(source_adapter, tables)
+        target_schema.load(target_adapter, tables)
+        
+        progress = MigrationProgress(len(tables))
+        mismatched_tables = []
+        workers = config.get('verify_workers', DEFAULT_VERIFY_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for table in tables:
+                if not is_running:
+                    raise Exception("校验被用户取消")
+                if not source_schema.exists(source_adapter, table) or not target_schema.exists(target_adapter, table):
+                    log_error(f"校验失败: {table} 源表或目标表不存在")
+                    mismatched_tables.append(table)
+                    progress.finish(table)
+                    continue
+                log_info(f"正在校验表 {table}...")
+                try:
+                    mismatches = verify_table(executor, source_adapter, target_adapter, table, source_schema,
+                                              target_schema, config)
+                except Exception as e:
+                    log_error(f"校验失败: {table} {str(e)}")
+                    mismatched_tables.append(table)
+                    source_adapter.rollback()
+                    target_adapter.rollback()
+                    continue
+                finally:
+                    progress.finish(table)
+                if mismatches:
+                    mismatched_tables.append(table)
+                    log_error(f"数据不一致: {table}，{len(mismatches)} 个区间")
+                    for description, source_rows, target_rows in mismatches:
+                        log_error(f"  {description}: 源 {source_rows} 行, 目标 {target_rows} 行")
+                else:
+                    log_info(f"校验通过: {table}")
+        if not is_running:
+            raise Exception("校验被用户取消")
+        return mismatched_tables
+    finally:
+        if source_adapter is not None:
+            release_adapter(source_adapter, 'source')
+        if target_adapter is not None:
+            release_adapter(target_adapter, 'target')
+        close_pools()
+
+# ---------------- 离线两阶段迁移（export / import）----------------
+# 源库与目标库无法同时在线时，export 只连接源库，把每张表按 stage_chunk_rows 行分块写入 stage_dir，
+# 并在 manifest.json 中记录源表列定义、索引、外键和每块行数；import 只连接目标库，按清单建表、
+# 以 stage_workers 个连接并行加载分块（每块一个事务，瞬时错误时整块重载），最后建索引和外键。
+# text 格式为 PostgreSQL COPY 文本（NULL 为 \N），PostgreSQL 目标直接 COPY 解压后的文件流，
+# 其他目标按源列类型还原为 Python 值后批量写入；parquet 格式需要 pyarrow，读写均为列式批次
+
+# 每个分块文件的行数、导入时并行加载的分块数（可在配置文件中通过 stage_chunk_rows/stage_workers 覆盖）
+DEFAULT_STAGE_CHUNK_ROWS = 1000000
+DEFAULT_STAGE_WORKERS = 4
+STAGE_MANIFEST_FILE = 'manifest.json'
+
+# 导入 text 格式时按源列类型还原值（CHECKSUM_* 之外的类型）
+STAGE_FLOAT_TYPES = {'float', 'real', 'double', 'double precision', 'binary_float', 'binary_double'}
+STAGE_DECIMAL_TYPES = {'decimal', 'numeric', 'number', 'money', 'smallmoney'}
+STAGE_BINARY_TYPES = {'binary', 'varbinary', 'image', 'bytea', 'blob', 'tinyblob', 'mediumblob', 'longblob',
+                      'raw', 'long raw'}
+
+_STAGE_ESCAPES = {'\\': '\\', 't': '\t', 'n': '\n', 'r': '\r'}
+_STAGE_ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+def _stage_unescape(text):
+    if '\\' not in text:
+        return text
+    return _STAGE_ESCAPE_PATTERN.sub(lambda match: _STAGE_ESCAPES.get(match.group(1), match.group(1)), text)
+
+def _stage_decode_bool(text):
+    return {'t': True, 'f': False}.get(text, text)
+
+def _stage_decode_binary(text):
+    return bytes.fromhex(text[2:]) if text.startswith('\\x') else text
+
+def _stage_decode_datetime(text):
+    # 无法解析的值（如带时区名的文本）原样交给目标库
+    try:
+        if len(text) == 10:
+            return datetime.date.fromisoformat(text)
+        return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+def stage_text_decoder(source_type):
+    # 返回把 COPY 文本值还原为 Python 值的函数，字符串类型返回 None
+    kind = classify_checksum_type(source_type)
+    if kind == 'number':
+        return int
+    if kind == 'bool':
+        return _stage_decode_bool
+    if kind == 'date':
+        return _stage_decode_datetime
+    base = str(source_type).split('(')[0].strip().lower()
+    if base in STAGE_FLOAT_TYPES:
+        return float
+    if base in STAGE_DECIMAL_TYPES:
+        return decimal.Decimal
+    if base in STAGE_BINARY_TYPES:
+        return _stage_decode_binary
+    return None
+
+def decode_stage_line(line, decoders):
+    values = []
+    for text, decode in zip(line.decode('utf-8')[:-1].split('\t'), decoders):
+        if text == '\\N':
+            values.append(None)
+        else:
+            text = _stage_unescape(text)
+            values.append(decode(text) if decode is not None else text)
+    return tuple(values)
+
+def check_stage_config(fmt, compression):
+    if fmt not in ('text', 'parquet'):
+        raise Exception(f"不支持的 stage_format: {fmt}（可选 text / parquet）")
+    if compression not in ('zstd', 'gzip', 'none'):
+        raise Exception(f"不支持的 stage_compression: {compression}（可选 zstd / gzip / none）")
+    if fmt == 'parquet' and pa is None:
+        raise Exception("stage_format: parquet 需要安装 pyarrow（pip install pyarrow）")
+    if fmt == 'text' and compression == 'zstd' and zstandard is None:
+        raise Exception("stage_compression: zstd 需要安装 zstandard（pip install zstandard），或改用 gzip")
+
+def open_stage_writer(path, compression):
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+    if compression == 'gzip':
+        return gzip.open(path, 'wb')
+    return open(path, 'wb')
+
+@contextlib.contextmanager
+def open_stage_reader(path, compression):
+    # 分块文件以内存映射方式读取，压缩文件由解压流按需读入，不整体载入内存
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if compression == 'zstd':
+            stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(mapped, closefd=False))
+        elif compression == 'gzip':
+            stream = gzip.GzipFile(fileobj=mapped, mode='rb')
+        else:
+            stream = mapped
+        try:
+            yield stream
+        finally:
+            if stream is not mapped:
+                stream.close()
+
+class StageChunkWriter:
+    # 单个分块文件：text 格式写 COPY 文本行，parquet 格式写列式批次（压缩由 Parquet 自身完成）；
+    # parquet 的 schema 由清单中的源列类型确定，所有分块一致，不取自第一批的值
+    def __init__(self, path, fmt, compression, schema=None):
+        self.path = path
+        self.fmt = fmt
+        self.compression = compression
+        self.rows = 0
+        self.writer = None
+        self.schema = schema
+        if fmt == 'text':
+            self.writer = open_stage_writer(path, compression)
+    
+    def write(self, batch):
+        if self.fmt == 'parquet':
+            if self.writer is None:
+                compression = None if self.compression == 'none' else self.compression
+                self.writer = pq.ParquetWriter(self.path, self.schema, compression=compression)
+            self.writer.write_batch(conform_record_batch(batch, self.schema))
+        else:
+            self.writer.write(''.join(
+                ['\t'.join([_pg_copy_text_value(v) for v in row]) + '\n' for row in batch]).encode('utf-8'))
+        self.rows += len(batch)
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+def load_stage_manifest(stage_dir):
+    path = os.path.join(stage_dir, STAGE_MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_stage_manifest(stage_dir, manifest):
+    path = os.path.join(stage_dir, STAGE_MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+def remove_stage_files(stage_dir, entry):
+    for chunk in (entry or {}).get('chunks', []):
+        path = os.path.join(stage_dir, chunk['file'])
+        if os.path.exists(path):
+            os.remove(path)
+
+def export_table(source_adapter, table_name, columns, stage_dir, config, progress, total_rows):
+    # 全表流式读取，每满 stage_chunk_rows 行换一个分块文件；返回清单中该表的条目
+    fmt = config.get('stage_format', 'text')
+    compression = config.get('stage_compression', 'zstd')
+    batch_size = config.get('batch_size', DEFAULT_BATCH_SIZE)
+    chunk_rows = config.get('stage_chunk_rows', DEFAULT_STAGE_CHUNK_ROWS)
+    extension = 'parquet' if fmt == 'parquet' else {'zstd': 'tsv.zst', 'gzip': 'tsv.gz'}.get(compression, 'tsv')
+    query = f"SELECT * FROM {table_name}"
+    schema = None
+    if fmt == 'parquet':
+        source_types = {col[0].lower(): col[1] for col in columns}
+        columns_names, batches = source_adapter.stream_arrow(query, batch_size, source_types=source_types)
+        schema = arrow_schema(columns_names, source_types)
+    else:
+        columns_names, batches = source_adapter.stream_rows(query, batch_size)
+    chunks = []
+    writer = None
+    try:
+        for batch in batches:
+            if not is_running:
+                raise Exception("导出被用户取消")
+            if writer is None:
+                file_name = f"{table_name}.{len(chunks):05d}.{extension}"
+                writer = StageChunkWriter(os.path.join(stage_dir, file_name), fmt, compression, schema)
+                chunks.append({'file': file_name, 'rows': 0})
+            writer.write(batch)
+            progress.advance(table_name, len(batch), total_rows)
+            if writer.rows >= chunk_rows:
+                writer.close()
+                chunks[-1].update(rows=writer.rows, bytes=os.path.getsize(writer.path))
+                writer = None
+        if writer is not None:
+            writer.close()
+            chunks[-1].update(rows=writer.rows, bytes=os.path.getsize(writer.path))
+    except Exception:
+        if writer is not None:
+            writer.close()
+        remove_stage_files(stage_dir, {'chunks': chunks})
+        raise
+    finally:
+        batches.close()
+    # 清单中的列按分块文件中的列顺序记录，导入时按此顺序建表和写入
+    columns_by_name = {col[0].lower(): col for col in columns}
+    return {
+        'columns': [list(columns_by_name.get(name.lower(), (name, None, None))[:3]) for name in columns_names],
+        'rows': sum(chunk['rows'] for chunk in chunks),
+        'chunks': chunks,
+    }
 
+def run_export(config, tables=None, export_all=False):
+    # 导出入口：只连接源库，表按 workers 并行导出；每张表完成后立即写入清单，重跑时覆盖该表的分块
+    stage_dir = config.get('stage_dir') or 'stage'
+    fmt = config.get('stage_format', 'text')
+    compression = config.get('stage_compression', 'zstd')
+    check_stage_config(fmt, compression)
+    os.makedirs(stage_dir, exist_ok=True)
+    manifest = load_stage_manifest(stage_dir)
+    if manifest is None or manifest['format'] != fmt or manifest['compression'] != compression:
+        if manifest is not None:
+            log_info(f"导出格式变更，清空原有导出: {stage_dir}")
+            for entry in manifest['tables'].values():
+                remove_stage_files(stage_dir, entry)
+        manifest = {'version': 1, 'source_type': config['source']['type'], 'format': fmt,
+                    'compression': compression, 'tables': {}}
+    open_pools(config, ('source',))
+    source_adapter = None
     try:
-        log_info("正在连接源数据库...", text_widget)
-        source_adapter.connect(config['source']['config'])
-        log_info("正在连接目标数据库...", text_widget)
-        target_adapter.connect(config['target']['config'])
+        source_adapter = acquire_adapter(config, 'source')
+        if export_all:
+            tables = source_adapter.get_all_tables()
+        elif not tables:
+            tables = get_table_names(config)
+        log_info(f"本次导出表列表: {tables}")
+        schema = SchemaCache(config.get('schema_cache_file') or None)
+        schema.load(source_adapter, tables)
+        estimates = load_row_estimates(source_adapter, tables, config)
+        pending = []
+        row_counts = {}
+        for table in tables:
+            if not schema.exists(source_adapter, table):
+                log_error(f"源表不存在: {table}")
+                continue
+            pending.append(table)
+            row_counts[table] = count_table_rows(source_adapter, table, estimates)
         
-        tables = source_adapter.get_all_tables() if migrate_all else [t.lower() for t in config['tables']]
-        log_info(f"本次迁移表列表: {tables}", text_widget)
+        progress = MigrationProgress(len(pending))
+        lock = threading.Lock()
+        failed_tables = []
         
-        migrate_tables(source_adapter, target_adapter, tables, text_widget, progress)
-        messagebox.showinfo("成功", "迁移任务完成！")
+        def export_one(table):
+            if not is_running:
+                return
+            adapter = acquire_adapter(config, 'source')
+            try:
+                log_info(f"正在导出表 {table}...")
+                with lock:
+                    remove_stage_files(stage_dir, manifest['tables'].pop(table, None))
+                    save_stage_manifest(stage_dir, manifest)
+                start = time.perf_counter()
+                entry = export_table(adapter, table, schema.get_columns(adapter, table), stage_dir, config,
+                                     progress, row_counts[table])
+                entry['indexes'] = adapter.get_index_definitions(table)
+                entry['foreign_keys'] = adapter.get_foreign_keys(table)
+                entry['exported_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+                with lock:
+                    manifest['tables'][table] = entry
+                    save_stage_manifest(stage_dir, manifest)
+                log_info(f"导出完成: {table} {entry['rows']} 条记录，{len(entry['chunks'])} 个分块，"
+                         f"耗时 {time.perf_counter() - start:.1f} 秒")
+            except Exception as e:
+                log_error(f"表导出失败: {table} {str(e)}")
+                failed_tables.append(table)
+            finally:
+                release_adapter(adapter, 'source')
+                progress.finish(table)
         
+        with ThreadPoolExecutor(max_workers=max(min(config.get('workers', 1), len(pending)), 1)) as executor:
+            list(executor.map(export_one, pending))
+        if not is_running:
+            raise Exception("导出被用户取消")
+        if failed_tables:
+            raise Exception(f"{len(failed_tables)} 张表导出失败: {failed_tables}")
+    finally:
+        if source_adapter is not None:
+            release_adapter(source_adapter, 'source')
+        close_pools()
+
+def load_stage_chunk(adapter, table_name, columns_names, column_types, path, fmt, compression, batch_size,
+                     decoders=None, convert=None):
+    # 在调用方的事务中加载一个分块，返回行数
+    if fmt == 'parquet':
+        rows = 0
+        for record_batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size):
+            if not is_running:
+                raise Exception("导入被用户取消")
+            adapter.write_arrow(table_name, columns_names, record_batch, column_types)
+            rows += record_batch.num_rows
+        return rows
+    with open_stage_reader(path, compression) as stream:
+        if decoders is None:
+            # PostgreSQL 目标：分块内容即 COPY 文本，直接作为 COPY 的输入流
+            adapter.cursor.copy_expert(f"COPY {table_name} ({', '.join(columns_names)}) FROM STDIN", stream)
+            return adapter.cursor.rowcount
+        rows = 0
+        batch = []
+        for line in iter(stream.readline, b''):
+            batch.append(decode_stage_line(line, decoders))
+            if len(batch) >= batch_size:
+                if not is_running:
+                    raise Exception("导入被用户取消")
+                adapter.bulk_insert(table_name, columns_names, convert(batch) if convert else batch, column_types)
+                rows += len(batch)
+                batch = []
+        if batch:
+            adapter.bulk_insert(table_name, columns_names, convert(batch) if convert else batch, column_types)
+            rows += len(batch)
+        return rows
+
+def import_stage_chunk(config, table_name, columns_names, column_types, path, fmt, compression, decoders, convert):
+    # 每个分块独占一个目标连接和一个事务；瞬时错误时回滚并重连后整块重载（回滚后该块的行都不在目标表中）
+    batch_size = config.get('batch_size', DEFAULT_BATCH_SIZE)
+    attempts = config.get('retry_attempts', DEFAULT_RETRY_ATTEMPTS)
+    attempt = 0
+    adapter = acquire_adapter(config, 'target')
+    if adapter.commits_each_batch():
+        # 每批已提交，回滚后整块重载会重复写入
+        attempts = 0
+    try:
+        while True:
+            try:
+                rows = load_stage_chunk(adapter, table_name, columns_names, column_types, path, fmt, compression,
+                                        batch_size, decoders, convert)
+                adapter.commit()
+                return rows
+            except Exception as e:
+                try:
+                    adapter.rollback()
+                except Exception:
+                    pass
+                if attempt >= attempts or not is_running or not adapter.is_transient_error(e):
+                    raise
+                delay = retry_delay(attempt, config)
+                attempt += 1
+                log_info(f"{table_name} 分块 {os.path.basename(path)} 遇到瞬时错误，{delay:.1f} 秒后重连并重新加载"
+                         f"（第 {attempt} 次重试）: {str(e)}", "orange")
+                wait_for_retry(delay)
+                adapter.reconnect()
+    finally:
+        release_adapter(adapter, 'target')
+
+def import_table(executor, target_adapter, table_name, entry, manifest, stage_dir, config, progress):
+    # 建表后并行加载全部分块，行数与清单不一致时报错；主键/索引在加载完成后创建
+    source_types, target_types, column_defs = build_target_columns(target_adapter, entry['columns'])
+    create_sql = target_adapter.build_create_table_sql(table_name, column_defs)
+    log_info(f"执行建表SQL: {create_sql}")
+    target_adapter.cursor.execute(create_sql)
+    target_adapter.commit()
+    
+    columns_names = [col[0] for col in entry['columns']]
+    column_types = [target_types.get(c.lower()) or 'TEXT' for c in columns_names]
+    fmt = manifest['format']
+    decoders = convert = None
+    if fmt == 'text':
+        convert = build_row_converter(columns_names, source_types, target_types)
+        if convert is not None or not isinstance(target_adapter, PostgreSQLAdapter):
+            decoders = [stage_text_decoder(source_types.get(c.lower())) for c in columns_names]
+    
+    load_start = time.perf_counter()
+    futures = {
+        executor.submit(import_stage_chunk, config, table_name, columns_names, column_types,
+                        os.path.join(stage_dir, chunk['file']), fmt, manifest['compression'], decoders, convert): chunk
+        for chunk in entry['chunks']
+    }
+    loaded = 0
+    try:
+        for future in as_completed(futures):
+            rows = future.result()
+            if rows != futures[future]['rows']:
+                raise Exception(f"分块 {futures[future]['file']} 导入 {rows} 行，清单记录 {futures[future]['rows']} 行")
+            loaded += rows
+            progress.advance(table_name, rows, entry['rows'])
+    except Exception:
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        raise
+    load_seconds = time.perf_counter() - load_start
+    
+    indexes = entry.get('indexes', []) if config.get('create_indexes', True) else []
+    index_seconds = build_deferred_indexes(target_adapter, table_name, indexes, config)
+    target_adapter.finish_fast_load(table_name)
+    log_info(f"导入完成: {table_name} {loaded} 条记录，加载耗时 {load_seconds:.1f} 秒，"
+             f"索引创建耗时 {index_seconds:.1f} 秒（{len(indexes)} 个）")
+
+def run_import(config, tables=None):
+    # 导入入口：只连接目标库，表逐张导入，每张表的分块在 stage_workers 个连接上并行加载
+    stage_dir = config.get('stage_dir') or 'stage'
+    manifest = load_stage_manifest(stage_dir)
+    if manifest is None:
+        raise Exception(f"未找到导出清单: {os.path.join(stage_dir, STAGE_MANIFEST_FILE)}")
+    check_stage_config(manifest['format'], manifest['compression'])
+    if not tables:
+        tables = list(manifest['tables'])
+    log_info(f"本次导入表列表: {tables}（导出格式 {manifest['format']}，压缩 {manifest['compression']}）")
+    open_pools(config, ('target',))
+    target_adapter = None
+    try:
+        target_adapter = acquire_adapter(config, 'target')
+        progress = MigrationProgress(len(tables))
+        imported = {}
+        failed_tables = []
+        workers = config.get('stage_workers', DEFAULT_STAGE_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for table in tables:
+                if not is_running:
+                    raise Exception("导入被用户取消")
+                entry = manifest['tables'].get(table)
+                if entry is None:
+                    log_error(f"导出清单中没有该表: {table}")
+                    failed_tables.append(table)
+                    progress.finish(table)
+                    continue
+                log_info(f"正在导入表 {table}...")
+                try:
+                    import_table(executor, target_adapter, table, entry, manifest, stage_dir, config, progress)
+                    imported[table] = entry
+                except Exception as e:
+                    log_error(f"表导入失败: {table} {str(e)}")
+                    failed_tables.append(table)
+                    target_adapter.rollback()
+                finally:
+                    progress.finish(table)
+        if not is_running:
+            raise Exception("导入被用户取消")
+        
+        if imported and config.get('create_foreign_keys', True):
+            for table, entry in imported.items():
+                build_foreign_keys(target_adapter, table, entry.get('foreign_keys', []), imported)
+        if failed_tables:
+            raise Exception(f"{len(failed_tables)} 张表导入失败: {failed_tables}")
+    finally:
+        if target_adapter is not None:
+            release_adapter(target_adapter, 'target')
+        close_pools()
+
+# 界面刷新间隔（毫秒）：迁移线程的日志/进度事件先缓存，由界面线程按此间隔合并刷新
+GUI_REFRESH_MS = 200
+
+class GuiSubscriber:
+    def __init__(self, root, text_widget, progress):
+        self.root = root
+        self.text_widget = text_widget
+        self.progress = progress
+        self.lock = threading.Lock()
+        self.messages = []
+        self.percent = None
+    
+    def __call__(self, event, data):
+        # 迁移线程中调用，只缓存不触碰界面
+        with self.lock:
+            if event == 'log':
+                self.messages.append((data['message'], data['color']))
+            elif event == 'progress':
+                self.percent = data['percent']
+    
+    def start(self):
+        self.root.after(GUI_REFRESH_MS, self.refresh)
+    
+    def refresh(self):
+        with self.lock:
+            messages, self.messages = self.messages, []
+            percent, self.percent = self.percent, None
+        for message, color in messages:
+            append_to_log(self.text_widget, message, color)
+        if percent is not None:
+            self.progress["value"] = percent
+        self.root.after(GUI_REFRESH_MS, self.refresh)
+
+def run_migration_task(root, progress, migrate_all):
+    global is_running
+    try:
+        run_migration(load_config(), migrate_all=migrate_all)
+        root.after(0, messagebox.showinfo, "成功", "迁移任务完成！")
     except Exception as e:
-        log_error(f"迁移失败: {str(e)}", text_widget)
-        messagebox.showerror("错误", f"迁移失败: {str(e)}")
+        log_error(f"迁移失败: {str(e)}")
+        root.after(0, messagebox.showerror, "错误", f"迁移失败: {str(e)}")
     finally:
-        source_adapter.disconnect()
-        target_adapter.disconnect()
-        for widget in root.winfo_children():
-            if isinstance(widget, tk.Button):
-                widget.config(state=tk.NORMAL if widget.cget("text") == "开始迁移" else tk.DISABLED)
-        progress["value"] = 0
         is_running = False
+        root.after(0, reset_controls, root, progress)
+
+def reset_controls(root, progress):
+    for widget in root.winfo_children():
+        if isinstance(widget, tk.Button):
+            widget.config(state=tk.NORMAL if widget.cget("text") == "开始迁移" else tk.DISABLED)
+    progress["value"] = 0
 
-def start_migration(root, text_widget, progress):
+def start_migration(root, progress):
     global is_running
     is_running = True
     for widget in root.winfo_children():
@@ -333,7 +4301,7 @@ def start_migration(root, text_widget, progress):
             widget.config(state=tk.DISABLED if widget.cget("text") == "开始迁移" else tk.NORMAL)
     threading.Thread(
         target=run_migration_task, 
-        args=(root, text_widget, progress, root.migrate_all_var.get()),
+        args=(root, progress, root.migrate_all_var.get()),
         daemon=True
     ).start()
 
@@ -343,13 +4311,15 @@ def stop_migration():
 
 def append_to_log(text_widget, message, color):
     text_widget.config(state=tk.NORMAL)
-    text_widget.insert(tk.END, f"{message}\n", "color")
-    text_widget.tag_config("color", foreground=color)
+    text_widget.insert(tk.END, f"{message}\n", color)
+    text_widget.tag_config(color, foreground=color)
     text_widget.see(tk.END)
     text_widget.config(state=tk.DISABLED)
 
 def create_gui():
     global root
+    if tk is None:
+        raise SystemExit("当前环境没有 tkinter，请使用命令行模式: python sync_table-2.0.py migrate --config ...")
     root = tk.Tk()
     root.title("数据库迁移工具 v3.3")
     
@@ -365,11 +4335,121 @@ def create_gui():
     options_frame.pack()
     
     control_frame = tk.Frame(root)
-    tk.Button(control_frame, text="开始迁移", command=lambda: start_migration(root, log_text, progress)).pack(side=tk.LEFT, padx=5)
+    tk.Button(control_frame, text="开始迁移", command=lambda: start_migration(root, progress)).pack(side=tk.LEFT, padx=5)
     tk.Button(control_frame, text="取消", state=tk.DISABLED, command=stop_migration).pack(side=tk.LEFT, padx=5)
     control_frame.pack()
     
+    subscriber = GuiSubscriber(root, log_text, progress)
+    add_listener(subscriber)
+    subscriber.start()
     root.mainloop()
 
+# 命令行进度输出的最小间隔（秒）
+CLI_PROGRESS_INTERVAL = 1.0
+
+class ConsoleProgress:
+    def __init__(self):
+        self.last_report = 0.0
+    
+    def __call__(self, event, data):
+        # 日志已由 log_info 打印，这里只按间隔输出进度
+        if event != 'progress':
+            return
+        now = time.monotonic()
+        if now - self.last_report >= CLI_PROGRESS_INTERVAL or data['percent'] >= 100:
+            self.last_report = now
+            print(f"进度: {data['percent']:.1f}%", flush=True)
+
+# 各子命令在日志中的名称
+CLI_ACTIONS = {'migrate': '迁移', 'verify': '校验', 'export': '导出', 'import': '导入'}
+
+def run_cli(args):
+    global is_running
+    config = load_config(args.config)
+    verify = args.command == 'verify'
+    action = CLI_ACTIONS[args.command]
+    if args.workers is not None:
+        config[{'verify': 'verify_workers', 'import': 'stage_workers'}.get(args.command, 'workers')] = args.workers
+    if getattr(args, 'batch_size', None) is not None:
+        config['batch_size'] = args.batch_size
+    if getattr(args, 'engine', None) is not None:
+        config['engine'] = args.engine
+    if getattr(args, 'stage_dir', None):
+        config['stage_dir'] = args.stage_dir
+    tables = [t.strip().lower() for t in args.tables.split(',') if t.strip()] if args.tables else None
+    
+    def cancel(signum, frame):
+        # 第一次 Ctrl+C 让各线程在当前批次结束后退出，第二次直接中断
+        global is_running
+        if not is_running:
+            raise KeyboardInterrupt
+        log_error(f"收到中断信号，正在停止{action}...")
+        is_running = False
+    
+    signal.signal(signal.SIGINT, cancel)
+    console = ConsoleProgress()
+    add_listener(console)
+    is_running = True
+    try:
+        if verify:
+            mismatched_tables = run_verification(config, tables, args.all)
+        elif args.command == 'export':
+            run_export(config, tables, args.all)
+        elif args.command == 'import':
+            run_import(config, tables)
+        else:
+            run_migration(config, tables, args.all)
+    except Exception as e:
+        log_error(f"{action}失败: {str(e)}")
+        return 1
+    finally:
+        is_running = False
+        remove_listener(console)
+    if verify:
+        if mismatched_tables:
+            log_error(f"校验完成，{len(mismatched_tables)} 张表不一致: {mismatched_tables}")
+            return 2
+        log_info("校验完成，所有表一致！")
+        return 0
+    log_info(f"{action}任务完成！")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--version', action='version', version='数据库迁移工具 v3.3')
+    subparsers = parser.add_subparsers(dest='command')
+    migrate_parser = subparsers.add_parser('migrate', help='无界面执行迁移')
+    migrate_parser.add_argument('--config', default='config-v1.0.yaml')
+    migrate_parser.add_argument('--tables', help='逗号分隔的表名，默认使用配置文件中的 tables')
+    migrate_parser.add_argument('--all', action='store_true', help='迁移源库中的全部表')
+    migrate_parser.add_argument('--workers', type=int, help='并行迁移的表数，覆盖配置文件中的 workers')
+    migrate_parser.add_argument('--batch-size', type=int, help='覆盖配置文件中的 batch_size')
+    migrate_parser.add_argument('--engine', choices=['threads', 'async'], help='覆盖配置文件中的 engine')
+    verify_parser = subparsers.add_parser('verify', help='按区间校验和比对源表与目标表数据')
+    verify_parser.add_argument('--config', default='config-v1.0.yaml')
+    verify_parser.add_argument('--tables', help='逗号分隔的表名，默认使用配置文件中的 tables')
+    verify_parser.add_argument('--all', action='store_true', help='校验源库中的全部表')
+    verify_parser.add_argument('--workers', type=int, help='并行查询的区间数，覆盖配置文件中的 verify_workers')
+    export_parser = subparsers.add_parser('export', help='只连接源库，把表数据导出为分块文件和清单')
+    export_parser.add_argument('--config', default='config-v1.0.yaml')
+    export_parser.add_argument('--tables', help='逗号分隔的表名，默认使用配置文件中的 tables')
+    export_parser.add_argument('--all', action='store_true', help='导出源库中的全部表')
+    export_parser.add_argument('--workers', type=int, help='并行导出的表数，覆盖配置文件中的 workers')
+    export_parser.add_argument('--batch-size', type=int, help='覆盖配置文件中的 batch_size')
+    export_parser.add_argument('--stage-dir', help='导出目录，覆盖配置文件中的 stage_dir')
+    import_parser = subparsers.add_parser('import', help='只连接目标库，按清单导入 export 生成的分块文件')
+    import_parser.add_argument('--config', default='config-v1.0.yaml')
+    import_parser.add_argument('--tables', help='逗号分隔的表名，默认导入清单中的全部表')
+    import_parser.add_argument('--workers', type=int, help='并行加载的分块数，覆盖配置文件中的 stage_workers')
+    import_parser.add_argument('--batch-size', type=int, help='覆盖配置文件中的 batch_size')
+    import_parser.add_argument('--stage-dir', help='导出目录，覆盖配置文件中的 stage_dir')
+    subparsers.add_parser('gui', help='启动图形界面（默认）')
+    args = parser.parse_args(argv)
+    
+    if args.command in CLI_ACTIONS:
+        return run_cli(args)
+    create_gui()
+    return 0
+
 if __name__ == '__main__':
-    create_gui()
\ No newline at end of file
+    sys.exit(main())
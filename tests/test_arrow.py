@@ -0,0 +1,48 @@
+# 列式传输的单元测试：Arrow schema 按源列类型确定，不随批次取值变化（需要 pyarrow）
+import decimal
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+
+def row_source(sync, columns, rows):
+    # 通用 stream_arrow 由 stream_rows 的行批次转换，每批一行
+    class RowSource(sync.DatabaseAdapter):
+        def stream_rows(self, query, batch_size=sync.DEFAULT_BATCH_SIZE, params=None, sizer=None):
+            return columns, ([row] for row in rows)
+    return RowSource()
+
+
+def spill(sync, tmp_path, columns, rows, source_types):
+    source = row_source(sync, columns, rows)
+    columns_names, batches = source.stream_arrow('SELECT * FROM t', 1, None, source_types)
+    schema = sync.arrow_schema(columns_names, source_types)
+    path = str(tmp_path / 't.parquet')
+    record_batches = list(sync.spill_to_parquet(batches, path, 100, schema))
+    return [row for record_batch in record_batches for row in record_batch.to_pylist()]
+
+
+def test_spill_keeps_growing_decimals(sync, tmp_path):
+    rows = [(decimal.Decimal('1.5'),), (decimal.Decimal('123456789.123456'),), (decimal.Decimal('-7'),)]
+    result = spill(sync, tmp_path, ['amount'], rows, {'amount': 'decimal'})
+    assert [decimal.Decimal(row['amount']) for row in result] == [row[0] for row in rows]
+
+
+def test_spill_types_columns_that_start_with_nulls(sync, tmp_path):
+    rows = [(None, None), (5, 1.25), (None, None)]
+    result = spill(sync, tmp_path, ['n', 'f'], rows, {'n': 'int', 'f': 'float'})
+    assert [(row['n'], row['f']) for row in result] == rows
+
+
+def test_spill_keeps_wide_integers(sync, tmp_path):
+    rows = [(1, 1), (2 ** 64 - 1, 10 ** 30)]
+    result = spill(sync, tmp_path, ['u', 'n'], rows, {'u': 'bigint(20) unsigned', 'n': 'numeric'})
+    assert [(row['u'], int(row['n'])) for row in result] == rows
+
+
+def test_arrow_schema_from_source_types(sync):
+    import pyarrow as pa
+    schema = sync.arrow_schema(['a', 'b', 'c', 'd', 'e'],
+                               {'a': 'bigint', 'b': 'DATE', 'c': 'date', 'd': 'varbinary', 'e': 'uniqueidentifier'})
+    assert schema.types == [pa.int64(), pa.timestamp('us'), pa.date32(), pa.binary(), pa.string()]
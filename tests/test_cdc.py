@@ -0,0 +1,105 @@
+# CDC 变更解析与合并的单元测试：不连接数据库，主程序由 conftest.py 的 sync 夹具加载
+import json
+
+
+class RecordingTarget:
+    def __init__(self):
+        self.deleted = []
+        self.upserted = []
+
+    def delete_rows(self, table_name, key_columns, keys):
+        self.deleted.append((table_name, list(key_columns), list(keys)))
+
+    def upsert_rows(self, table_name, columns, rows, key_columns, column_types=None):
+        self.upserted.append((table_name, list(columns), list(rows), list(key_columns), list(column_types)))
+
+
+def wal2json_row(action, columns=None, identity=None):
+    change = {'action': action}
+    if columns is not None:
+        change['columns'] = [{'name': name, 'value': value} for name, value in columns.items()]
+    if identity is not None:
+        change['identity'] = [{'name': name, 'value': value} for name, value in identity.items()]
+    return (json.dumps(change),)
+
+
+def test_wal2json_events_maps_actions(sync):
+    adapter = sync.PostgreSQLAdapter()
+    batches = iter([
+        [
+            wal2json_row('B'),
+            wal2json_row('I', columns={'id': 1, 'name': 'a'}),
+            wal2json_row('U', columns={'id': 1, 'name': 'b'}),
+            wal2json_row('D', identity={'id': 2}),
+            wal2json_row('C'),
+        ],
+        [wal2json_row('B'), wal2json_row('C')],
+    ])
+    events = list(adapter._wal2json_events(batches))
+    # 只含事务边界的批次不产出
+    assert events == [[
+        ('upsert', {'id': 1, 'name': 'a'}),
+        ('upsert', {'id': 1, 'name': 'b'}),
+        ('delete', {'id': 2}),
+    ]]
+
+
+def test_sqlserver_cdc_events_maps_operations(sync):
+    adapter = sync.SQLServerAdapter()
+    columns = ['__$start_lsn', '__$seqval', '__$operation', '__$update_mask', 'id', 'name']
+    batches = iter([
+        [
+            (b'\x01', b'\x01', 2, b'\x03', 1, 'a'),
+            (b'\x02', b'\x01', 4, b'\x02', 1, 'b'),
+            (b'\x03', b'\x01', 1, b'\x03', 2, 'c'),
+        ],
+    ])
+    events = list(adapter._cdc_events(columns, batches))
+    assert events == [[
+        ('upsert', {'id': 1, 'name': 'a'}),
+        ('upsert', {'id': 1, 'name': 'b'}),
+        ('delete', {'id': 2, 'name': 'c'}),
+    ]]
+
+
+def test_apply_cdc_changes_last_change_wins(sync):
+    target = RecordingTarget()
+    changes = [
+        ('upsert', {'id': 1, 'name': 'a'}),
+        ('upsert', {'id': 1, 'name': 'b'}),
+        ('upsert', {'id': 2, 'name': 'x'}),
+        ('delete', {'id': 2}),
+        ('delete', {'id': 3}),
+        ('upsert', {'id': 3, 'name': 'back'}),
+    ]
+    sync.apply_cdc_changes(target, 't', changes, ['id'], {'id': 'INTEGER', 'name': 'VARCHAR(50)'})
+    assert target.deleted == [('t', ['id'], [(2,)])]
+    assert len(target.upserted) == 1
+    table_name, columns, rows, key_columns, column_types = target.upserted[0]
+    assert (table_name, columns, key_columns, column_types) == ('t', ['id', 'name'], ['id'], ['INTEGER', 'VARCHAR(50)'])
+    assert sorted(rows) == [(1, 'b'), (3, 'back')]
+
+
+def test_apply_cdc_changes_composite_key(sync):
+    target = RecordingTarget()
+    changes = [
+        ('upsert', {'a': 1, 'b': 1, 'v': 'old'}),
+        ('upsert', {'a': 1, 'b': 2, 'v': 'other'}),
+        ('delete', {'a': 1, 'b': 1}),
+    ]
+    sync.apply_cdc_changes(target, 't', changes, ['a', 'b'], {})
+    assert target.deleted == [('t', ['a', 'b'], [(1, 1)])]
+    assert target.upserted[0][2] == [(1, 2, 'other')]
+    assert target.upserted[0][4] == ['TEXT', 'TEXT', 'TEXT']
+
+
+def test_apply_cdc_changes_without_changes(sync):
+    target = RecordingTarget()
+    sync.apply_cdc_changes(target, 't', [], ['id'], {})
+    assert target.deleted == [] and target.upserted == []
+
+
+def test_timed_batches_accepts_plain_iterators(sync):
+    # 没有新变更时 CDC 读取器可能返回普通迭代器
+    assert list(sync.timed_batches(iter(()))) == []
+    assert [(seq, batch) for seq, batch, _ in sync.timed_batches(iter([[1], [2]]))] == [(0, [1]), (1, [2])]
@@ -0,0 +1,44 @@
+# 离线导出/导入的单元测试：parquet 分块的 schema 取自清单中的源列类型（需要 pyarrow）
+import decimal
+import os
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+
+def make_adapters(sync, columns, rows):
+    class RowSource(sync.DatabaseAdapter):
+        def stream_rows(self, query, batch_size=sync.DEFAULT_BATCH_SIZE, params=None, sizer=None):
+            return columns, (rows[i:i + batch_size] for i in range(0, len(rows), batch_size))
+
+    class RecordingTarget(sync.DatabaseAdapter):
+        def __init__(self):
+            super().__init__()
+            self.rows = []
+
+        def bulk_insert(self, table_name, columns, rows, column_types=None):
+            self.rows.extend(rows)
+
+    return RowSource(), RecordingTarget()
+
+
+def test_parquet_stage_round_trip(sync, tmp_path):
+    import pyarrow.parquet as pq
+    # 第一块全为 NULL，小数位数逐行增长
+    rows = [(None, None, None), (None, None, None),
+            (1, decimal.Decimal('1.5'), 'a'), (2, decimal.Decimal('98765.4321'), None),
+            (3, decimal.Decimal('-0.000001'), 'c')]
+    source, target = make_adapters(sync, ['id', 'amount', 'name'], rows)
+    config = {'stage_format': 'parquet', 'stage_compression': 'none', 'batch_size': 1, 'stage_chunk_rows': 2}
+    columns = [('id', 'int', None), ('amount', 'decimal', None), ('name', 'nvarchar', 50)]
+    sync.is_running = True
+    entry = sync.export_table(source, 't', columns, str(tmp_path), config, sync.MigrationProgress(1), len(rows))
+    assert [chunk['rows'] for chunk in entry['chunks']] == [2, 2, 1]
+    paths = [os.path.join(str(tmp_path), chunk['file']) for chunk in entry['chunks']]
+    schemas = {str(pq.read_schema(path)) for path in paths}
+    assert len(schemas) == 1
+    for path in paths:
+        sync.load_stage_chunk(target, 't', ['id', 'amount', 'name'], ['INT', 'NUMERIC', 'VARCHAR(50)'], path,
+                              'parquet', 'none', 100)
+    assert [(i, None if a is None else decimal.Decimal(a), n) for i, a, n in target.rows] == rows